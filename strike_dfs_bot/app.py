@@ -1,75 +1,92 @@
 from flask import Flask, request, jsonify
 import uuid
-import json
 from datetime import datetime, timedelta
 import os
+from tokens import TokenSigner, TokenStore
 
 app = Flask(__name__)
 STORE_FILE = "token_store.json"
+TOKEN_DB_PATH = os.getenv("TOKEN_DB_PATH", "token_store.sqlite3")
 
-# Load token store from file
-def load_store():
-    if not os.path.exists(STORE_FILE):
-        return {}
-    with open(STORE_FILE, "r") as f:
-        return json.load(f)
+# Shared by every worker and thread; tokens from an old token_store.json are imported once
+store = TokenStore(TOKEN_DB_PATH, legacy_json=STORE_FILE)
+# Expired tokens are removed in bulk in the background, not only when someone verifies them
+store.start_sweeper(float(os.getenv("TOKEN_SWEEP_INTERVAL", 60)))
 
-# Save token store to file
-def save_store(data):
-    with open(STORE_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+# With a secret set, tokens are signed and carry their own user id and expiry,
+# so verifying one needs no lookup; only its nonce is stored once it's used
+TOKEN_SECRET = os.getenv("TOKEN_SECRET")
+signer = TokenSigner(TOKEN_SECRET) if TOKEN_SECRET else None
 
-# Create a new token
-@app.route("/generate_token", methods=["POST"])
-def generate_token():
-    data = request.get_json()
-    user_id = data.get("user_id")
+def issue_token(user_id):
+    """Create a login token for ``user_id``; returns ``(body, status)``."""
     if not user_id:
-        return jsonify({"error": "user_id required"}), 400
+        return {"error": "user_id required"}, 400
 
-    token = str(uuid.uuid4())[:8]
     expires_at = (datetime.utcnow() + timedelta(minutes=10)).isoformat()
+    if signer:
+        token = signer.issue(user_id, expires_at)
+    else:
+        token = str(uuid.uuid4())[:8]
+        # Short tokens can collide; draw again rather than overwrite someone else's
+        while not store.add(token, user_id, expires_at):
+            token = str(uuid.uuid4())[:8]
 
-    store = load_store()
-    store[token] = {
-        "user_id": user_id,
-        "expires_at": expires_at
-    }
-    save_store(store)
-
-    return jsonify({
+    return {
         "token": token,
         "expires_at": expires_at
-    })
+    }, 200
 
-# Verify the token
-@app.route("/api/discord/verify", methods=["GET"])
-def verify_token():
-    token = request.args.get("token")
-    store = load_store()
-
-    record = store.get(token)
+def check_token(token):
+    """Validate and use up ``token``; returns ``(body, status)``."""
+    # Stored tokens issued before signing was switched on still work
+    signed = signer is not None and token is not None and "." in token
+    record = signer.verify(token) if signed else store.get(token)
     if not record:
-        return jsonify({"success": False, "reason": "invalid token"}), 404
+        return {"success": False, "reason": "invalid token"}, 404
 
     expires_at = datetime.fromisoformat(record["expires_at"])
     if datetime.utcnow() > expires_at:
-        return jsonify({"success": False, "reason": "token expired"}), 403
+        return {"success": False, "reason": "token expired"}, 403
 
     # Optional: remove token after verification
-    del store[token]
-    save_store(store)
+    consumed = store.consume(record["nonce"], record["expires_at"]) if signed else store.delete(token)
+    if not consumed:
+        # Another request consumed it first
+        return {"success": False, "reason": "invalid token"}, 404
 
-    return jsonify({
+    return {
         "success": True,
         "user_id": record["user_id"],
         "username": f"{record['user_id']}@strike.app"
-    })
+    }, 200
+
+# The route logic above is shared with the ASGI server in asgi.py
+
+# Create a new token
+@app.route("/generate_token", methods=["POST"])
+def generate_token():
+    data = request.get_json()
+    body, status = issue_token(data.get("user_id"))
+    return jsonify(body), status
+
+# Verify the token
+@app.route("/api/discord/verify", methods=["GET"])
+def verify_token():
+    body, status = check_token(request.args.get("token"))
+    return jsonify(body), status
+
+# Token counts: live, expired but not yet swept, and swept so far
+@app.route("/token_stats", methods=["GET"])
+def token_stats():
+    return jsonify(store.stats())
+
+HOME_TEXT = "✅ Strike Auth Backend is running."
 
 # Health check
 @app.route("/")
 def home():
-    return "✅ Strike Auth Backend is running."
+    return HOME_TEXT
 
 
 if __name__ == "__main__":
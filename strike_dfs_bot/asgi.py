@@ -0,0 +1,164 @@
+"""ASGI server for the auth backend (app.py).
+
+Serves the same routes with the same response bytes as the Flask app, but
+the event loop never blocks: token-store calls run on a small thread pool
+(each thread keeps its own SQLite connection). Run it with
+
+    python asgi.py                      # WEB_CONCURRENCY workers on PORT
+    uvicorn asgi:application --workers 4
+
+On SIGTERM uvicorn stops accepting connections, lets in-flight requests
+finish (up to SHUTDOWN_TIMEOUT seconds), then the lifespan shutdown below
+stops the token sweeper and drains the thread pool.
+"""
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+from werkzeug.exceptions import BadRequest, InternalServerError, MethodNotAllowed, NotFound, UnsupportedMediaType
+
+from app import HOME_TEXT, app, check_token, issue_token, store
+
+STORE_THREADS = int(os.getenv("TOKEN_STORE_THREADS", 8))
+
+executor = None
+
+
+def _json(body, status=200):
+    # Flask's own serializer, so bodies match jsonify byte for byte
+    response = app.json.response(body)
+    return status, [(b"content-type", response.content_type.encode())], response.get_data()
+
+
+def _text(text):
+    return 200, [(b"content-type", b"text/html; charset=utf-8")], text.encode()
+
+
+def _error(exc):
+    headers = [(name.lower().encode(), value.encode()) for name, value in exc.get_headers()]
+    return exc.code, headers, exc.get_body().encode()
+
+
+def _is_json(headers):
+    mimetype = headers.get(b"content-type", b"").decode("latin-1").split(";")[0].strip().lower()
+    return mimetype == "application/json" or (
+        mimetype.startswith("application/") and mimetype.endswith("+json")
+    )
+
+
+async def _read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+async def _in_pool(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+
+async def generate_token(scope, receive):
+    # Same failure modes as request.get_json() in app.py
+    if not _is_json(dict(scope["headers"])):
+        return _error(UnsupportedMediaType(
+            "Did not attempt to load JSON data because the request Content-Type was not 'application/json'."
+        ))
+    try:
+        data = json.loads(await _read_body(receive))
+    except ValueError:
+        return _error(BadRequest())
+    if not isinstance(data, dict):
+        return _error(InternalServerError())
+    return _json(*await _in_pool(issue_token, data.get("user_id")))
+
+
+async def verify_token(scope, receive):
+    query = scope.get("query_string", b"").decode("utf-8", "replace")
+    args = dict(reversed(parse_qsl(query, keep_blank_values=True)))  # first value wins, like request.args
+    return _json(*await _in_pool(check_token, args.get("token")))
+
+
+async def token_stats(scope, receive):
+    return _json(await _in_pool(store.stats))
+
+
+async def home(scope, receive):
+    return _text(HOME_TEXT)
+
+
+# path -> (methods, handler); GET routes also answer HEAD, as in Flask
+ROUTES = {
+    "/generate_token": ({"POST"}, generate_token),
+    "/api/discord/verify": ({"GET"}, verify_token),
+    "/token_stats": ({"GET"}, token_stats),
+    "/": ({"GET"}, home),
+}
+
+
+def _allowed(methods):
+    allowed = set(methods) | {"OPTIONS"}
+    if "GET" in methods:
+        allowed.add("HEAD")
+    return sorted(allowed)
+
+
+async def _lifespan(receive, send):
+    global executor
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            executor = ThreadPoolExecutor(STORE_THREADS, thread_name_prefix="token-store")
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            store.stop_sweeper()
+            if executor is not None:
+                executor.shutdown(wait=True)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    method = scope["method"]
+    route = ROUTES.get(scope["path"])
+    if route is None:
+        status, headers, body = _error(NotFound())
+    else:
+        methods, handler = route
+        allowed = _allowed(methods)
+        if method == "OPTIONS":
+            status, headers, body = 200, [(b"allow", ", ".join(allowed).encode())], b""
+        elif method not in allowed:
+            status, headers, body = _error(MethodNotAllowed(allowed))
+        else:
+            try:
+                status, headers, body = await handler(scope, receive)
+            except Exception as e:
+                print(f"Error handling {method} {scope['path']}: {e}")
+                status, headers, body = _error(InternalServerError())
+
+    headers.append((b"content-length", str(len(body)).encode()))
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": b"" if method == "HEAD" else body})
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(
+        "asgi:application",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", 5000)),
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+        lifespan="on",
+        timeout_graceful_shutdown=int(os.getenv("SHUTDOWN_TIMEOUT", 30)),
+    )
@@ -0,0 +1,98 @@
+"""Deterministic parsing of bet-slip messages like "$20 on LeBron over 25.5 points and Curry u3.5 tov"."""
+import re
+
+from filters import stat_for
+
+# Entry fee: "$20", "20 dollars", "20 bucks", "entry fee 20"
+_FEE_PATTERNS = [
+    re.compile(r"(?:\bfor\s+|\bwith\s+)?\$\s*(\d+(?:\.\d+)?)(?:\s+on\b)?"),
+    re.compile(r"(?:\bfor\s+)?\b(\d+(?:\.\d+)?)\s*(?:dollars|bucks|usd)\b(?:\s+on\b)?"),
+    re.compile(r"\bentry(?:\s+fee)?\s*(?:of|is|=|:)?\s*\$?(\d+(?:\.\d+)?)"),
+]
+
+# Separators between legs of a multi-leg slip
+_LEG_SPLIT = re.compile(r"\s*(?:,|;|&|\+|\n|\band\b|\bplus\b|\balso\b)\s*")
+
+# "over 25.5", "o25.5", "under", "u 7"
+_BET_TYPE = re.compile(r"\b(over|under|o|u)\s*(\d+(?:\.\d+)?)?(?=\b|\s|$)")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+
+# Words with no meaning in a bet leg
+_FILLER_WORDS = {
+    "i", "id", "want", "wanna", "to", "would", "like", "please", "can", "you", "bet", "bets", "place",
+    "put", "add", "take", "give", "me", "a", "an", "the", "on", "for", "with", "my", "pick", "picks",
+    "parlay", "wager", "slip", "leg", "legs", "line", "of", "at", "his", "him", "then",
+}
+
+
+def _amount(value):
+    amount = float(value)
+    return int(amount) if amount.is_integer() else amount
+
+
+def _new_leg():
+    return {"name": None, "bet_type": None, "line_value": None, "stat_type": None}
+
+
+def _parse_leg(text, matcher, stat_keys, threshold):
+    """Parse one leg; returns None if part of it couldn't be understood."""
+    leg = _new_leg()
+
+    match = _BET_TYPE.search(text)
+    if match:
+        leg["bet_type"] = "over" if match.group(1).startswith("o") else "under"
+        if match.group(2):
+            leg["line_value"] = float(match.group(2))
+        text = text[:match.start()] + " " + text[match.end():]
+    if leg["line_value"] is None:
+        number = _NUMBER.search(text)
+        if number:
+            leg["line_value"] = float(number.group(0))
+            text = text[:number.start()] + " " + text[number.end():]
+
+    words = []
+    for word in re.findall(r"[a-z0-9'.\-]+", text):
+        word = word.strip(".'-")
+        stat = stat_for(word, stat_keys)
+        if stat and leg["stat_type"] is None:
+            leg["stat_type"] = stat
+        elif word and word not in _FILLER_WORDS:
+            words.append(word)
+
+    if not words:
+        return None
+    name, score = matcher.best(" ".join(words))
+    if not name or score < threshold:
+        return None
+    leg["name"] = name
+    return leg
+
+
+def parse_bet_slip(text, matcher, stat_keys, threshold=0.8):
+    """Parse a bet message into the ``extract_bet_info`` shape.
+
+    Returns ``(bet_data, unparsed)`` where ``bet_data`` is
+    ``{"entry_fee": ..., "players": [leg or None, ...]}`` with missing fields
+    set to None, and ``unparsed`` lists the leg texts (matching the None
+    slots) that need GPT.
+    """
+    text = " ".join(str(text).lower().split())
+    stat_keys = set(stat_keys)
+    bet_data = {"entry_fee": None, "players": []}
+
+    for pattern in _FEE_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            bet_data["entry_fee"] = _amount(match.group(1))
+            text = text[:match.start()] + " " + text[match.end():]
+            break
+
+    unparsed = []
+    for part in _LEG_SPLIT.split(text):
+        if not part.strip():
+            continue
+        leg = _parse_leg(part, matcher, stat_keys, threshold)
+        if leg is None:
+            unparsed.append(part.strip())
+        bet_data["players"].append(leg)
+    return bet_data, unparsed
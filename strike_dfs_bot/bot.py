@@ -1,45 +1,251 @@
+if __name__ == "__main__":
+    # Run as a script: start through main.py instead, because spawned render
+    # workers re-import ``__main__`` and would rebuild all the bot state below
+    import runpy
+
+    runpy.run_module("main", run_name="__main__", alter_sys=True)
+    raise SystemExit
+
 import discord
 from discord import ui, ButtonStyle
-import requests
+import io
 import os
 import re
-import openai
 import json
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
+import atexit
+import asyncio
 from difflib import get_close_matches
 from dotenv import load_dotenv
-from collections import defaultdict
 from datetime import datetime
+from lazy import lazy_import
+from lines import DeltaIngestor, LineIndex, LinesReloader, load_lines_cached
+from llm import LLMGateway, TTLCache, normalize_query
+from matching import PlayerMatcher, load_aliases
+from betslip import parse_bet_slip
+from filters import apply_filter, parse_filter_query, spec_from_json
+from intent import SEARCH, classify_intent
+from teams import TEAM_CODES, RosterStore, find_teams
+from sessions import SessionStore
+from rendering import (
+    RenderCache,
+    RenderService,
+    render_bet_confirmation_png,
+    render_lines_table_png,
+    render_player_stats_png,
+)
+
+# Loaded on first use (in the background at startup) so the bot can connect right away
+pd = lazy_import("pandas")
+requests = lazy_import("requests")
 
 # Environment setup
 load_dotenv()
 DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# "pillow" (fast) or "matplotlib" (original renderer)
+IMAGE_RENDERER = os.getenv("IMAGE_RENDERER", "pillow")
+
+# Local name matches at or above this score skip the GPT resolver
+PLAYER_MATCH_THRESHOLD = float(os.getenv("PLAYER_MATCH_THRESHOLD", 0.8))
+# Optional JSON file of extra {"nickname": "Full Name"} aliases
+PLAYER_ALIASES_PATH = os.getenv("PLAYER_ALIASES_PATH")
+
+# Team rosters cached on disk; refreshed with the "refresh rosters" command
+ROSTERS_PATH = os.getenv("ROSTERS_PATH", os.path.join(os.path.dirname(__file__), "team_rosters.json"))
+# Comma-separated Discord user ids allowed to refresh rosters (anyone verified if unset)
+ROSTER_ADMIN_IDS = {uid.strip() for uid in os.getenv("ROSTER_ADMIN_IDS", "").split(",") if uid.strip()}
+
+# Rendered table images, keyed by the rows they show
+render_cache = RenderCache()
+
+# Worker processes for matplotlib/PIL so renders don't block the event loop
+render_service = RenderService()
+
+
+def build_lines(new_df, new_index=None, previous=None):
+    """Build a lines snapshot: the table plus everything derived from it.
+
+    ``previous`` is the installed snapshot a delta patch started from; its
+    player matcher is reused while the set of players stays the same.
+    """
+    new_index = new_index if new_index is not None else LineIndex(new_df)
+    if previous is not None and previous[1].players_version == new_index.players_version:
+        return new_df, new_index, previous[2]
+    new_matcher = PlayerMatcher(new_index.players(), load_aliases(PLAYER_ALIASES_PATH))
+    return new_df, new_index, new_matcher
+
+
+def set_lines(snapshot, clear_renders=True):
+    """Install a lines snapshot from build_lines in one step."""
+    global df, line_index, player_matcher
+    df, line_index, player_matcher = snapshot
+    if clear_renders:
+        # Renders are keyed by their rows, so this only frees images of the old table
+        render_cache.clear()
+
 
-# Data initialization
+# Data initialization; the table is loaded by load_data once the bot is connecting
 csv_path = os.path.join(os.path.dirname(__file__), "betting_events_rows.csv")
-df = pd.read_csv(csv_path)
-betting_events = df.to_dict(orient="records")
+df = line_index = player_matcher = None
+# Set once the lines table and heavy modules are loaded; data features wait on it
+lines_ready = asyncio.Event()
+
+# Rebuilds the snapshot off the event loop whenever the CSV changes
+lines_reloader = LinesReloader(
+    csv_path,
+    lambda path: build_lines(*load_lines_cached(path)),
+    set_lines,
+    interval=float(os.getenv("LINES_RELOAD_INTERVAL", 60)),
+)
+
+# Optional directory of insert/update/close delta files applied on top of the table
+LINES_DELTA_DIR = os.getenv("LINES_DELTA_DIR")
+delta_ingestor = DeltaIngestor(
+    LINES_DELTA_DIR,
+    lambda: (df, line_index, player_matcher),
+    build_lines,
+    # Most cached renders are of rows a small delta didn't touch
+    lambda snapshot: set_lines(snapshot, clear_renders=False),
+    interval=float(os.getenv("LINES_DELTA_INTERVAL", 5)),
+) if LINES_DELTA_DIR else None
 
 # API clients
-client_ai = openai.OpenAI(api_key=OPENAI_API_KEY)
+# Cached GPT answers for name/team/intent resolution; set LLM_CACHE_PATH to persist them
+llm_cache = TTLCache(
+    ttl=float(os.getenv("LLM_CACHE_TTL", 6 * 3600)),
+    path=os.getenv("LLM_CACHE_PATH"),
+)
+atexit.register(llm_cache.flush)
+
+# All GPT calls go through the gateway: bounded concurrency, timeouts and retries
+llm = LLMGateway(OPENAI_API_KEY, cache=llm_cache)
+
+# Seconds a user-facing GPT call may take in total, retries included
+LLM_DEADLINE = float(os.getenv("LLM_DEADLINE", 25))
+
+
+def llm_deadline(deadline=None):
+    """Event-loop time a GPT call must finish by.
+
+    Interaction handlers pass one down so every call made for them shares
+    one budget; calls made without one get ``LLM_DEADLINE`` seconds each.
+    """
+    if deadline is not None:
+        return deadline
+    return asyncio.get_running_loop().time() + LLM_DEADLINE
+
+
+roster_store = RosterStore(ROSTERS_PATH)
+roster_prewarm = None
+
+
+# Tries at loading the lines at startup (with backoff) before the bot gives up and exits
+LINES_LOAD_ATTEMPTS = int(os.getenv("LINES_LOAD_ATTEMPTS", 5))
+lines_load_failed = False
+
+
+async def load_data():
+    """Second startup stage: heavy imports and data, off the event loop."""
+    global lines_load_failed
+    loop = asyncio.get_running_loop()
+    for attempt in range(1, LINES_LOAD_ATTEMPTS + 1):
+        try:
+            # Reuses the binary snapshot next to the CSV when it was built from the same file
+            snapshot = await loop.run_in_executor(None, lambda: build_lines(*load_lines_cached(csv_path)))
+            break
+        except Exception as e:
+            print(f"❌ Could not load betting lines (attempt {attempt}/{LINES_LOAD_ATTEMPTS}): {e}")
+            if attempt == LINES_LOAD_ATTEMPTS:
+                # Every data feature waits on lines_ready; exit rather than hang them forever
+                lines_load_failed = True
+                await client.close()
+                return
+            await asyncio.sleep(min(2 ** attempt, 60))
+    set_lines(snapshot)
+    lines_ready.set()
+    print(f"✅ Betting lines loaded ({len(df)} rows)")
+
+    try:
+        # Import openai and requests now rather than on the first call that needs them
+        await loop.run_in_executor(None, lambda: (llm.client, requests.post))
+    except Exception as e:
+        print(f"⚠️ Could not initialize the OpenAI client: {e}")
+
+    lines_reloader.start()
+    if delta_ingestor is not None:
+        delta_ingestor.start()
+
+
+async def wait_for_lines(channel):
+    """Readiness gate for message handlers: tell the user and wait if data is still loading."""
+    if not lines_ready.is_set():
+        await channel.send("⏳ Loading betting lines, one moment...")
+        await lines_ready.wait()
+
+
+async def check_lines_ready(interaction):
+    """Readiness gate for buttons and modals, which must answer within a few seconds."""
+    if lines_ready.is_set():
+        return True
+    await interaction.response.send_message(
+        "⏳ StrikeBot is still loading betting lines. Please try again in a few seconds.",
+        ephemeral=True,
+    )
+    return False
+
+
+class ReadyView(ui.View):
+    """View whose buttons only run once the lines data is loaded."""
+
+    async def interaction_check(self, interaction: discord.Interaction):
+        return await check_lines_ready(interaction)
+
+
+class ReadyModal(ui.Modal):
+    """Modal that only submits once the lines data is loaded."""
+
+    async def interaction_check(self, interaction: discord.Interaction):
+        return await check_lines_ready(interaction)
+
+
+def resolution_key(kind, text):
+    """Cache key for a resolution answer; changes when the player list does."""
+    return f"{kind}|{line_index.players_version}|{normalize_query(text)}"
 
 # Discord setup
 intents = discord.Intents.default()
 intents.message_content = True
 client = discord.Client(intents=intents)
 
-# User state tracking
-verified_users = set()
-login_notified_users = set()
-user_modes = {}
-user_carts = {}
-incomplete_bets = {}
-user_login_attempts = {}
-user_nlp_bet_state = {}
+
+async def setup_hook():
+    global startup_task
+    # Runs after login, before the gateway connects: load data while connecting
+    startup_task = asyncio.create_task(load_data())
+    session_store.start()
+
+
+startup_task = None
+client.setup_hook = setup_hook
+
+# User state tracking; logins, modes, carts and bet progress survive restarts
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", os.path.join(os.path.dirname(__file__), "sessions.sqlite3"))
+session_store = SessionStore(SESSION_DB_PATH, interval=float(os.getenv("SESSION_FLUSH_INTERVAL", 2)))
+atexit.register(session_store.flush)
+
+# Idle sessions are swept after SESSION_TTL seconds; each namespace holds at most SESSION_MAX_ENTRIES users
+SESSION_TTL = float(os.getenv("SESSION_TTL", 24 * 3600))
+LOGIN_TTL = float(os.getenv("LOGIN_TTL", 30 * 24 * 3600))
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", 100_000))
+session_limits = {"ttl": SESSION_TTL, "max_entries": SESSION_MAX_ENTRIES}
+
+verified_users = session_store.set("verified_users", ttl=LOGIN_TTL, max_entries=SESSION_MAX_ENTRIES)
+login_notified_users = session_store.set("login_notified_users", **session_limits)
+user_modes = session_store.dict("user_modes", **session_limits)
+user_carts = session_store.dict("user_carts", **session_limits)
+incomplete_bets = session_store.dict("incomplete_bets", **session_limits)
+user_login_attempts = session_store.dict("user_login_attempts", **session_limits)
+user_nlp_bet_state = session_store.dict("user_nlp_bet_state", **session_limits)
 
 async def handle_verification(message):
     user_id = str(message.author.id)
@@ -56,83 +262,28 @@ async def handle_search_query(message, user_id):
 
 
 # Template dictionary to store in-progress bets per user
-guided_bet_state = defaultdict(dict)
+guided_bet_state = session_store.dict("guided_bet_state", default_factory=dict, **session_limits)
 
 
-def generate_player_stat_image(player_name, filename="player_stats_preview.png"):
-    player_df = df[df["player_name"].str.lower() == player_name.lower()]
+async def generate_player_stat_image(player_name, filename="player_stats_preview.png", renderer=None):
+    renderer = renderer or IMAGE_RENDERER
+    player_df = df.iloc[line_index.player(player_name)]
     if player_df.empty:
         return None
 
-    # Set the style for the plot
-    plt.style.use('ggplot')
-    
-    # Create figure with a dark background
-    fig, ax = plt.subplots(figsize=(10, min(0.5 * len(player_df) + 1, 20)))
-    fig.patch.set_facecolor('#2C2F33')  # Discord-like dark background
-    ax.set_facecolor('#2C2F33')
-    ax.axis('off')
-    
-    # Add a title with player name and NBA styling
-    ax.set_title(f"{player_name}'s Prop Betting Lines", fontsize=16, color='white', fontweight='bold', pad=20)
-    
-    # Table formatting
+    # Reuse the last render of the same rows if we have one
     table_data = player_df[["stat_type", "line_value", "opponent"]].values.tolist()
-    table = ax.table(
-        cellText=table_data,
-        colLabels=["Stat Type", "Line", "Opponent"],
-        loc='center',
-        cellLoc='center',
-        colWidths=[0.4, 0.2, 0.4]  # Adjust column widths for better proportions
-    )
-    
-    # Style the table
-    table.auto_set_font_size(False)
-    table.set_fontsize(11)
-    table.scale(1.2, 1.5)
-    
-    # Style header row with NBA team colors (using Lakers purple and gold)
-    header_color = '#552583'  # Lakers purple
-    header_text_color = '#FDB927'  # Lakers gold
-    
-    for col in range(3):
-        cell = table[0, col]
-        cell.set_facecolor(header_color)
-        cell.set_text_props(color=header_text_color, weight='bold')
-        cell.set_edgecolor('white')
-    
-    # Style data rows with alternating colors
-    for row in range(1, len(table_data) + 1):
-        row_color = '#36393F' if row % 2 == 0 else '#40444B'  # Discord-like alternating row colors
-        
-        for col in range(3):
-            cell = table[row, col]
-            cell.set_facecolor(row_color)
-            cell.set_text_props(color='white')
-            cell.set_edgecolor('#23272A')  # Darker border color
-    
-    # Add a subtle border around the entire table
-    for pos, cell in table._cells.items():
-        cell.set_linewidth(0.5)
-    
-    # Add a subtle player note at the bottom
-    fig.text(
-        0.5, 0.02, 
-        f"StrikeBot • {player_name} Props", 
-        ha='center', 
-        color='#FDB927', 
-        alpha=0.7,
-        fontsize=10,
-        fontweight='bold'
-    )
-    
-    # Save with high quality
-    plt.savefig(filename, bbox_inches='tight', dpi=200, facecolor=fig.get_facecolor())
-    plt.close(fig)
-    return filename
+    cache_key = RenderCache.make_key("player_stats", renderer, player_name, table_data)
+    image_bytes = render_cache.get(cache_key)
+    if image_bytes is None:
+        image_bytes = await render_service.render(render_player_stats_png, player_name, table_data, renderer)
+        render_cache.put(cache_key, image_bytes)
+
+    # Hand Discord an in-memory attachment; nothing touches the filesystem
+    return discord.File(io.BytesIO(image_bytes), filename=filename)
 
 
-def resolve_player_name(user_input):
+async def resolve_player_name(user_input, owner=None, deadline=None):
     try:
         prompt = f"""
 You are an NBA player nickname resolver. Match user input to full player names. 
@@ -151,15 +302,12 @@ User Input: "{user_input}"
 Your task: Return ONLY the best matching full player name from the list above. Return as a plain string, no markdown, no explanations. If no clear match, return an empty string.
 """
 
-        response = client_ai.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0
+        name = await llm.ask(
+            prompt, owner=owner, deadline=llm_deadline(deadline),
+            cache_key=resolution_key("player", user_input),
         )
-
-        name = response.choices[0].message.content.strip()
         # Check if it's in the actual player list to avoid hallucination
-        if name and name in df["player_name"].values:
+        if name and line_index.canonical_player(name) == name:
             return name
         return None
     except Exception as e:
@@ -167,53 +315,21 @@ Your task: Return ONLY the best matching full player name from the list above. R
         return None
 
 
-def resolve_team_name(user_input):
+async def resolve_player(user_input, owner=None, deadline=None):
+    """Resolve free text to a player name, asking GPT only when the local match is weak."""
+    name, score = player_matcher.best(user_input)
+    if name and score >= PLAYER_MATCH_THRESHOLD:
+        return name
+    return await resolve_player_name(user_input, owner=owner, deadline=deadline)
+
+
+async def resolve_team_name(user_input, owner=None, deadline=None):
     """Identify NBA team from user input and return current roster players."""
     try:
-        # NBA team mappings by conference
-        eastern_teams = {
-            "atlanta": "ATL", "hawks": "ATL", "atl": "ATL",
-            "boston": "BOS", "celtics": "BOS", "bos": "BOS",
-            "brooklyn": "BKN", "nets": "BKN", "bkn": "BKN",
-            "charlotte": "CHA", "hornets": "CHA", "cha": "CHA",
-            "chicago": "CHI", "bulls": "CHI", "chi": "CHI",
-            "cleveland": "CLE", "cavaliers": "CLE", "cavs": "CLE", "cle": "CLE",
-            "detroit": "DET", "pistons": "DET", "det": "DET",
-            "indiana": "IND", "pacers": "IND", "ind": "IND",
-            "miami": "MIA", "heat": "MIA", "mia": "MIA",
-            "milwaukee": "MIL", "bucks": "MIL", "mil": "MIL",
-            "new york": "NYK", "knicks": "NYK", "nyk": "NYK",
-            "orlando": "ORL", "magic": "ORL", "orl": "ORL",
-            "philadelphia": "PHI", "76ers": "PHI", "sixers": "PHI", "phi": "PHI",
-            "toronto": "TOR", "raptors": "TOR", "tor": "TOR",
-            "washington": "WAS", "wizards": "WAS", "was": "WAS",
-        }
-        
-        western_teams = {
-            "dallas": "DAL", "mavericks": "DAL", "mavs": "DAL", "dal": "DAL",
-            "denver": "DEN", "nuggets": "DEN", "den": "DEN",
-            "golden state": "GSW", "warriors": "GSW", "gsw": "GSW", "gs": "GSW",
-            "houston": "HOU", "rockets": "HOU", "hou": "HOU",
-            "los angeles clippers": "LAC", "clippers": "LAC", "lac": "LAC",
-            "los angeles lakers": "LAL", "lakers": "LAL", "lal": "LAL",
-            "memphis": "MEM", "grizzlies": "MEM", "mem": "MEM",
-            "minnesota": "MIN", "timberwolves": "MIN", "wolves": "MIN", "min": "MIN",
-            "new orleans": "NOP", "pelicans": "NOP", "pels": "NOP", "nop": "NOP",
-            "oklahoma city": "OKC", "thunder": "OKC", "okc": "OKC",
-            "phoenix": "PHX", "suns": "PHX", "phx": "PHX",
-            "portland": "POR", "trail blazers": "POR", "blazers": "POR", "por": "POR",
-            "sacramento": "SAC", "kings": "SAC", "sac": "SAC",
-            "san antonio": "SAS", "spurs": "SAS", "sas": "SAS",
-            "utah": "UTA", "jazz": "UTA", "uta": "UTA"
-        }
-        
-        team_mappings = {**eastern_teams, **western_teams}
-        user_input_lower = user_input.lower()
-        
-        # Direct mapping check
-        for team_term, team_code in team_mappings.items():
-            if team_term in user_input_lower:
-                return get_team_players(team_code)
+        # Direct mapping check (whole words only, so "minutes" is not MIN)
+        found = find_teams(user_input)
+        if found:
+            return await get_team_players(found[0][0], owner=owner, deadline=deadline)
         
         # Fallback to AI-based team resolution
         prompt = f"""You are an NBA team name resolver. Given a user input, determine if it refers to an NBA team.
@@ -223,15 +339,12 @@ User Input: "{user_input}"
 If the input refers to an NBA team, return ONLY the team's 3-letter code (e.g., LAL, GSW, BOS).
 If it doesn't clearly refer to an NBA team, return an empty string."""
         
-        response = client_ai.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0
+        team_code = await llm.ask(
+            prompt, owner=owner, deadline=llm_deadline(deadline),
+            cache_key=resolution_key("team", user_input),
         )
-        
-        team_code = response.choices[0].message.content.strip()
         if team_code and len(team_code) == 3:
-            return get_team_players(team_code)
+            return await get_team_players(team_code, owner=owner, deadline=deadline)
         
         return None
     except Exception as e:
@@ -239,39 +352,63 @@ If it doesn't clearly refer to an NBA team, return an empty string."""
         return None
 
 
-def get_team_players(team_code):
-    """Get current roster players for an NBA team."""
-    try:
-        prompt = f"""You are an NBA team roster expert. Given a team, return the players who CURRENTLY play for that team.
+async def fetch_team_roster(team_code, owner=None, deadline=None):
+    """Ask GPT for a team's current roster (league-wide, not limited to the slate)."""
+    prompt = f"""You are an NBA team roster expert. Given a team, return the players who CURRENTLY play for that team.
 
 Team: {team_code}
 
-List of all players in the dataset:
-{json.dumps(df["player_name"].unique().tolist(), indent=2)}
+Your task: Return ONLY a JSON list of the full names of every player currently on the {team_code} roster.
+Format: ["Player Name 1", "Player Name 2", ...]"""
 
-Your task: Return ONLY a JSON list of player names who currently play for {team_code}. 
-Format: ["Player Name 1", "Player Name 2", ...]
-Only include players who are in the provided list and currently on the team's roster."""
-        
-        response = client_ai.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0
-        )
-        
-        response_text = response.choices[0].message.content.strip()
-        
-        # Extract JSON from code blocks if present
-        if response_text.startswith("```json") and response_text.endswith("```"):
-            response_text = response_text[7:-3].strip()
-        elif response_text.startswith("```") and response_text.endswith("```"):
-            response_text = response_text[3:-3].strip()
-        
-        team_players = json.loads(response_text)
-        if team_players and isinstance(team_players, list):
-            valid_players = [p for p in team_players if p in df["player_name"].values]
-            if valid_players:
-                return {"team": team_code, "players": valid_players}
+    response_text = await llm.ask(prompt, owner=owner, deadline=llm_deadline(deadline))
+
+    # Extract JSON from code blocks if present
+    if response_text.startswith("```json") and response_text.endswith("```"):
+        response_text = response_text[7:-3].strip()
+    elif response_text.startswith("```") and response_text.endswith("```"):
+        response_text = response_text[3:-3].strip()
+
+    players = json.loads(response_text)
+    if not isinstance(players, list):
+        raise ValueError("GPT response did not return a JSON list")
+    return [str(player) for player in players]
+
+
+async def refresh_rosters(team_codes=TEAM_CODES, owner=None, deadline=None):
+    """Re-fetch the given teams' rosters into the roster store; returns the codes that failed."""
+    results = await asyncio.gather(
+        *(fetch_team_roster(team_code, owner=owner, deadline=deadline) for team_code in team_codes),
+        return_exceptions=True,
+    )
+    failed = []
+    for team_code, result in zip(team_codes, results):
+        if isinstance(result, BaseException):
+            print(f"Error refreshing {team_code} roster: {result}")
+            failed.append(team_code)
+        elif not result:
+            # Stored, an empty roster would hide the team from missing() and never be refetched
+            print(f"Error refreshing {team_code} roster: GPT returned no players")
+            failed.append(team_code)
+        else:
+            roster_store.set(team_code, result)
+    roster_store.save()
+    return failed
+
+
+async def get_team_players(team_code, owner=None, deadline=None):
+    """Get current roster players for an NBA team that have lines on the slate."""
+    team_code = str(team_code).strip().upper()
+    if team_code not in TEAM_CODES:
+        return None
+    try:
+        team_players = roster_store.on_slate(team_code, line_index)
+        if team_players is None:
+            # Not prewarmed yet; fetch just this team once
+            await refresh_rosters([team_code], owner=owner, deadline=deadline)
+            team_players = roster_store.on_slate(team_code, line_index)
+        if team_players:
+            return {"team": team_code, "players": team_players}
     except Exception as e:
         print(f"Error getting team players: {e}")
     
@@ -323,8 +460,8 @@ async def handle_guided_bet(message, user_id, channel):
             for bet in user_cart
         ]
 
-        preview_image = generate_bet_confirmation_image(display_data, entry_fee="Pending", filename="cart_preview_confirming.png")
-        await channel.send(file=discord.File(preview_image))
+        preview_image = await generate_bet_confirmation_image(display_data, entry_fee="Pending", filename="cart_preview_confirming.png")
+        await channel.send(file=preview_image)
         state["step"] = "entry_fee"
         await channel.send("💰 Please type the **total bet amount** you'd like to place across all these picks (e.g., `20`).\nType `exit` to cancel.")
         return
@@ -345,8 +482,8 @@ async def handle_guided_bet(message, user_id, channel):
                 }
                 for bet in user_cart
             ]
-            cart_image = generate_bet_confirmation_image(display_data, amount, filename="cart_summary.png")
-            await channel.send(file=discord.File(cart_image))
+            cart_image = await generate_bet_confirmation_image(display_data, amount, filename="cart_summary.png")
+            await channel.send(file=cart_image)
             payload = generate_bets_payload(user_id, amount, user_cart)
             await channel.send("✅ Bets confirmed and placed! Cart is now cleared.\n Type `place bets` to make more picks.")
             await channel.send(f"📦 Final payload sent to Strike API:\n```json\n{json.dumps(payload, indent=2)}\n```")
@@ -367,29 +504,26 @@ async def handle_guided_bet(message, user_id, channel):
         return
 
     if step == "player":
-        player_names = df["player_name"].unique()
-        matched = get_close_matches(user_input, player_names, n=1, cutoff=0.6)
-        resolved_name = matched[0] if matched else resolve_player_name(user_input)
+        resolved_name = await resolve_player(user_input, owner=user_id)
 
-        if resolved_name and resolved_name in df["player_name"].values:
+        if resolved_name and line_index.canonical_player(resolved_name):
             state["player_name"] = resolved_name
             state["step"] = "stat"
-            image_path = generate_player_stat_image(resolved_name)
-            if image_path:
-                await channel.send(file=discord.File(image_path))
+            image_file = await generate_player_stat_image(resolved_name)
+            if image_file:
+                await channel.send(file=image_file)
             await channel.send(f"✅ Player selected: **{resolved_name}**\nNow type the **stat** you want to bet on (e.g., `points`, `rebounds`, `assists`).\n➡️ Type `exit` to cancel.")
         else:
             await channel.send("❌ Player not found. Please try again with a valid NBA player name.\n➡️ Type `exit` to cancel.")
         return
 
     if step == "stat":
-        valid_stats = df[df["player_name"] == state["player_name"]]["stat_type"].unique()
+        valid_stats = line_index.stats_for(state["player_name"])
         matched = get_close_matches(user_input.lower(), [s.lower() for s in valid_stats], n=1, cutoff=0.6)
         if matched:
             state["stat_type"] = matched[0]
-            lines = df[(df["player_name"] == state["player_name"]) &
-                       (df["stat_type"].str.lower() == matched[0])]["line_value"].unique()
-            state["valid_lines"] = lines.tolist()
+            lines = line_index.lines_for(state["player_name"], matched[0])
+            state["valid_lines"] = list(lines)
             state["step"] = "line"
             await channel.send(f"✅ Stat selected: **{matched[0]}**\nPlease type the **line value** you want (e.g., `{lines[0]}`).\n➡️ Type `exit` to cancel.")
         else:
@@ -431,116 +565,16 @@ async def handle_guided_bet(message, user_id, channel):
 
 
 
-def generate_bet_confirmation_image(bets_data, entry_fee, filename="bet_confirmation.png"):
-    import matplotlib.image as mpimg
-    from PIL import Image
-
-    # Set the style for the plot
-    plt.style.use('ggplot')
-
-    # Step 1: Generate main table image with modern styling
-    column_titles = ["Player", "Stat Type", "Line", "Bet Type"]
+async def generate_bet_confirmation_image(bets_data, entry_fee, filename="bet_confirmation.png", renderer=None):
+    renderer = renderer or IMAGE_RENDERER
     table_data = [
         [b["name"], b["stat_type"], b["line_value"], b["bet_type"]]
         for b in bets_data
     ]
+    image_bytes = await render_service.render(render_bet_confirmation_png, table_data, entry_fee, renderer)
 
-    # Create figure with a dark background
-    fig, ax = plt.subplots(figsize=(10, min(0.6 * len(table_data) + 1.5, 20)))
-    fig.patch.set_facecolor('#2C2F33')  # Discord-like dark background
-    ax.set_facecolor('#2C2F33')
-    ax.axis('off')
-
-    # Create the table with custom styling
-    table = ax.table(
-        cellText=table_data,
-        colLabels=column_titles,
-        loc='center',
-        cellLoc='center',
-        colWidths=[0.3, 0.3, 0.15, 0.25]  # Adjust column widths for better proportions
-    )
-
-    # Style the table
-    table.auto_set_font_size(False)
-    table.set_fontsize(11)
-    table.scale(1.2, 1.5)
-
-    # Style header row with a green theme for confirmation
-    header_color = '#1E8449'  # Dark green
-    header_text_color = '#FFFFFF'  # White text
-    
-    for col in range(len(column_titles)):
-        cell = table[0, col]
-        cell.set_facecolor(header_color)
-        cell.set_text_props(color=header_text_color, weight='bold')
-        cell.set_edgecolor('white')
-
-    # Style data rows with alternating colors
-    for row in range(1, len(table_data) + 1):
-        row_color = '#36393F' if row % 2 == 0 else '#40444B'  # Discord-like alternating row colors
-        
-        for col in range(len(column_titles)):
-            cell = table[row, col]
-            cell.set_facecolor(row_color)
-            cell.set_text_props(color='white')
-            cell.set_edgecolor('#23272A')  # Darker border color
-
-    # Add a subtle border around the entire table
-    for pos, cell in table._cells.items():
-        cell.set_linewidth(0.5)
-
-    # Set title with entry fee information if provided
-    title = "Bet Confirmation"
-    if entry_fee is not None:
-        title = f"Bet Confirmation - ${entry_fee}"
-    ax.set_title(title, fontsize=16, color='white', fontweight='bold', pad=20)
-
-    # Add a subtle confirmation note at the bottom
-    fig.text(
-        0.5, 0.02, 
-        "StrikeBot • Bet Confirmation", 
-        ha='center', 
-        color='#7CFC00', 
-        alpha=0.7,
-        fontsize=10,
-        fontweight='bold'
-    )
-
-    # Save table as temporary image with high quality
-    temp_filename = "temp_table_image.png"
-    plt.savefig(temp_filename, bbox_inches='tight', dpi=200, facecolor=fig.get_facecolor())
-    plt.close(fig)
-
-    # Step 2: Load both table image and logo
-    table_img = Image.open(temp_filename)
-    logo_path = os.path.join(os.path.dirname(__file__), "bet_confirmation.png")  # your uploaded logo
-    
-    try:
-        logo_img = Image.open(logo_path).convert("RGBA")
-        
-        # Resize logo to 15% of table width
-        new_logo_width = int(table_img.width * 0.15)
-        aspect_ratio = logo_img.height / logo_img.width
-        new_logo_size = (new_logo_width, int(new_logo_width * aspect_ratio))
-        logo_img = logo_img.resize(new_logo_size, Image.LANCZOS)
-
-        # Create new image with space for both - using dark background
-        spacing = 20
-        total_height = table_img.height + logo_img.height + spacing
-        new_img = Image.new("RGBA", (table_img.width, total_height), (44, 47, 51, 255))  # Discord dark color
-        new_img.paste(table_img, (0, 0))
-        new_img.paste(logo_img, ((table_img.width - logo_img.width) // 2, table_img.height + spacing), logo_img)
-
-        # Save final image
-        new_img.convert("RGB").save(filename)
-    except Exception as e:
-        # If logo processing fails, just use the table image
-        print(f"Warning: Could not process logo: {e}")
-        table_img.convert("RGB").save(filename)
-    
-    # Clean up temporary file
-    os.remove(temp_filename)
-    return filename
+    # Hand Discord an in-memory attachment; nothing touches the filesystem
+    return discord.File(io.BytesIO(image_bytes), filename=filename)
 
 
 async def prompt_start_options(channel):
@@ -552,7 +586,11 @@ def prompt_verify(channel):
     """Sends verification reminder."""
     return channel.send("\u26A0\uFE0F Please verify first using: `verify <username> <password>`")
 
-def is_filtration_question(text):
+async def is_filtration_question(text, owner=None, deadline=None):
+    # Known vocabulary and betting keywords settle most messages without GPT
+    intent = classify_intent(text, player_matcher, list(line_index.by_stat), threshold=PLAYER_MATCH_THRESHOLD)
+    if intent is not None:
+        return intent == SEARCH
     try:
         prompt = f"""
 You are a strict classifier. Classify the following query ONLY as "yes" if the user is trying to search or filter for existing player prop lines — not placing a bet.
@@ -582,12 +620,10 @@ Query:
 
 Reply with only one word: "yes" or "no".
 """
-        response = client_ai.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0
-        )
-        reply = response.choices[0].message.content.strip().lower()
+        reply = (await llm.ask(
+            prompt, owner=owner, deadline=llm_deadline(deadline),
+            cache_key=resolution_key("intent", text),
+        )).lower()
         return reply == "yes"
     except Exception as e:
         print(f"❌ Error in classifier: {e}")
@@ -599,33 +635,34 @@ async def handle_search_mode(user_id, message, channel):
     
     if query == "exit":
         user_modes[user_id] = None
+        llm.cancel(user_id)
         await channel.send("✅ Exited search mode.")
         # Show main menu
         await channel.send("Main Menu:", view=MainMenuView())
         return
     
     # Process the search query
-    if is_filtration_question(query):
+    if await is_filtration_question(query, owner=user_id):
         await channel.send("🔍 Searching lines...")
-        filtered_df = get_filtered_rows(query)
+        filtered_df = await get_filtered_rows(query, owner=user_id)
         if filtered_df.empty:
             await channel.send("❌ No matching lines found.")
         else:
-            image_path = generate_table_image(filtered_df)
-            await channel.send(file=discord.File(image_path))
+            image_file = await generate_table_image(filtered_df)
+            await channel.send(file=image_file)
         
         # Add exit button after showing results
         await channel.send("Click the button below to exit:", view=ExitSearchView())
         return
     
     # Search for matching players
-    matching_players = df[df["player_name"].str.lower().str.contains(query)]
+    matching_players = df[df["player_key"].str.contains(query, regex=False)]
     if not matching_players.empty:
         # Generate and send player stats image
         player_name = matching_players.iloc[0]["player_name"]
-        image_path = generate_player_stat_image(player_name)
-        if image_path:
-            await channel.send(file=discord.File(image_path))
+        image_file = await generate_player_stat_image(player_name)
+        if image_file:
+            await channel.send(file=image_file)
         else:
             await channel.send(f"Found player {player_name} but no stats are available.")
         
@@ -633,15 +670,15 @@ async def handle_search_mode(user_id, message, channel):
         await channel.send("Click the button below to exit:", view=ExitSearchView())
     else:
         # Try to match teams or stats
-        team_matches = df[df["opponent"].str.lower().str.contains(query)]
-        stat_matches = df[df["stat_type"].str.lower().str.contains(query)]
+        team_matches = df[df["opponent_key"].str.contains(query, regex=False)]
+        stat_matches = df[df["stat_key"].str.contains(query, regex=False)]
         
         if not team_matches.empty:
-            image_path = generate_table_image(team_matches.head(15))
-            await channel.send(file=discord.File(image_path))
+            image_file = await generate_table_image(team_matches.head(15))
+            await channel.send(file=image_file)
         elif not stat_matches.empty:
-            image_path = generate_table_image(stat_matches.head(15))
-            await channel.send(file=discord.File(image_path))
+            image_file = await generate_table_image(stat_matches.head(15))
+            await channel.send(file=image_file)
         else:
             await channel.send("❗ That doesn't look like a search query. Try a player, team, or stat type.")
         
@@ -706,11 +743,11 @@ class BettingLinesDropdown(ui.Select):
         if ":" in selected_value:
             category, value = selected_value.split(":", 1)
             if category == "player":
-                filtered_df = df[df["player_name"] == value]
+                filtered_df = df.iloc[line_index.player(value)]
             elif category == "stat":
-                filtered_df = df[df["stat_type"] == value]
+                filtered_df = df.iloc[line_index.stat(value)]
             elif category == "opponent":
-                filtered_df = df[df["opponent"] == value]
+                filtered_df = df.iloc[line_index.opponent(value)]
         else:
             # Direct selection based on the dropdown category
             if self.category == "player":
@@ -722,14 +759,14 @@ class BettingLinesDropdown(ui.Select):
                     view.add_item(BettingLinesDropdown("player", self.page + 1))
                     await interaction.channel.send(f"Players (Page {self.page + 2}/{self.total_pages}):", view=view)
                     return
-                filtered_df = df[df["player_name"] == selected_value]
+                filtered_df = df.iloc[line_index.player(selected_value)]
             elif self.category == "stat":
-                filtered_df = df[df["stat_type"] == selected_value]
+                filtered_df = df.iloc[line_index.stat(selected_value)]
             elif self.category == "opponent":
-                filtered_df = df[df["opponent"] == selected_value]
+                filtered_df = df.iloc[line_index.opponent(selected_value)]
             else:
                 # Default case
-                filtered_df = df[df["player_name"] == selected_value]
+                filtered_df = df.iloc[line_index.player(selected_value)]
         
         await interaction.response.defer()
         
@@ -747,14 +784,14 @@ class BettingLinesDropdown(ui.Select):
                 await interaction.channel.send(f"🔍 **Showing lines for {selection_type}: {selected_value}**")
             
             # Show the results in a nicely formatted table
-            image_path = generate_table_image(filtered_df)
-            await interaction.channel.send(file=discord.File(image_path))
+            image_file = await generate_table_image(filtered_df)
+            await interaction.channel.send(file=image_file)
         
         # Show browse options again
         view = BrowseLinesView()
         await interaction.channel.send("Browse more betting lines:", view=view)
 
-class AdvancedSearchModal(ui.Modal, title="Advanced Search"):
+class AdvancedSearchModal(ReadyModal, title="Advanced Search"):
     search_query = ui.TextInput(
         label="Search Query", 
         placeholder="Enter player, team, and/or stat (e.g., Steph Curry assists, Lakers, Bucks points)", 
@@ -770,6 +807,7 @@ class AdvancedSearchModal(ui.Modal, title="Advanced Search"):
         await self.process_advanced_search(interaction, query)
     
     async def process_advanced_search(self, interaction, query):
+        user_id = str(interaction.user.id)
         # Common stat abbreviations and variations mapping
         stat_mappings = {
             "pts": "points", "point": "points", "scoring": "points",
@@ -782,59 +820,17 @@ class AdvancedSearchModal(ui.Modal, title="Advanced Search"):
         
         # Parse query into components (split by 'and' or commas)
         sub_queries = [q.strip() for q in re.split(r'\s+and\s+|\s*,\s*', query)]
+        # Resolve every part at once so latency follows the slowest part, not the sum
+        deadline = llm_deadline()
+        resolved = await asyncio.gather(
+            *(self._resolve_sub_query(sub_query, user_id, stat_mappings, deadline) for sub_query in sub_queries)
+        )
         all_results = []
         result_descriptions = []
-        
-        for sub_query in sub_queries:
-            sub_query_lower = sub_query.lower()
-            filtered_df = None
-            result_desc = ""
-            
-            # Process team queries
-            team_result = resolve_team_name(sub_query)
-            if team_result:
-                filtered_df, result_desc = self._process_team_query(
-                    team_result, sub_query_lower, stat_mappings
-                )
-                if filtered_df is not None and not filtered_df.empty:
-                    all_results.append(filtered_df)
-                    result_descriptions.append(result_desc)
-                continue
-            
-            # Process player and stat queries
-            resolved_player = resolve_player_name(sub_query)
-            found_stats = self._find_stats_in_query(sub_query_lower, stat_mappings)
-            
-            if resolved_player and found_stats:
-                # Player + stat(s) query
-                filtered_df = self._filter_by_player_and_stats(resolved_player, found_stats)
-                if not filtered_df.empty:
-                    all_results.append(filtered_df)
-                    result_descriptions.append(f"{resolved_player} {', '.join(found_stats)}")
-            
-            elif resolved_player:
-                # Player-only query
-                filtered_df = df[df["player_name"] == resolved_player]
-                if not filtered_df.empty:
-                    all_results.append(filtered_df)
-                    result_descriptions.append(f"{resolved_player}")
-            
-            elif found_stats:
-                # Stat-only query
-                filtered_df = self._filter_by_stats(found_stats)
-                if not filtered_df.empty:
-                    all_results.append(filtered_df)
-                    result_descriptions.append(f"{', '.join(found_stats)}")
-            
-            else:
-                # Fallback to GPT-based filtering
-                try:
-                    filtered_df = get_filtered_rows(sub_query)
-                    if not filtered_df.empty:
-                        all_results.append(filtered_df)
-                        result_descriptions.append(f"{sub_query}")
-                except Exception as e:
-                    print(f"Error using get_filtered_rows for '{sub_query}': {e}")
+        for filtered_df, result_desc in resolved:
+            if filtered_df is not None and not filtered_df.empty:
+                all_results.append(filtered_df)
+                result_descriptions.append(result_desc)
         
         # Display results
         if not all_results:
@@ -849,13 +845,46 @@ class AdvancedSearchModal(ui.Modal, title="Advanced Search"):
         result_summary = " and ".join(result_descriptions)
         
         await interaction.channel.send(f"🔍 **Showing lines for: {result_summary}**")
-        image_path = generate_table_image(combined_df)
-        await interaction.channel.send(file=discord.File(image_path))
+        image_file = await generate_table_image(combined_df)
+        await interaction.channel.send(file=image_file)
         await interaction.channel.send("Browse more betting lines:", view=BrowseLinesView())
     
+    async def _resolve_sub_query(self, sub_query, user_id, stat_mappings, deadline=None):
+        """Resolve one part of an advanced search to ``(rows, description)``."""
+        sub_query_lower = sub_query.lower()
+        
+        # Process team queries
+        team_result = await resolve_team_name(sub_query, owner=user_id, deadline=deadline)
+        if team_result:
+            return self._process_team_query(team_result, sub_query_lower, stat_mappings)
+        
+        # Process player and stat queries
+        resolved_player = await resolve_player(sub_query, owner=user_id, deadline=deadline)
+        found_stats = self._find_stats_in_query(sub_query_lower, stat_mappings)
+        
+        if resolved_player and found_stats:
+            # Player + stat(s) query
+            filtered_df = self._filter_by_player_and_stats(resolved_player, found_stats)
+            return filtered_df, f"{resolved_player} {', '.join(found_stats)}"
+        
+        if resolved_player:
+            # Player-only query
+            return df.iloc[line_index.player(resolved_player)], f"{resolved_player}"
+        
+        if found_stats:
+            # Stat-only query
+            return self._filter_by_stats(found_stats), f"{', '.join(found_stats)}"
+        
+        # Fallback to GPT-based filtering
+        try:
+            return await get_filtered_rows(sub_query, owner=user_id, deadline=deadline), f"{sub_query}"
+        except Exception as e:
+            print(f"Error using get_filtered_rows for '{sub_query}': {e}")
+            return None, ""
+    
     def _find_stats_in_query(self, query_text, stat_mappings):
         """Extract stat types from query text."""
-        all_stats = [stat.lower() for stat in df["stat_type"].unique()]
+        all_stats = df["stat_key"].cat.categories.tolist()
         found_stats = [stat for stat in all_stats if stat in query_text]
         
         # Check for common variations and abbreviations
@@ -876,66 +905,52 @@ class AdvancedSearchModal(ui.Modal, title="Advanced Search"):
         # Find stats in the query
         found_stats = self._find_stats_in_query(query_text, stat_mappings)
         
-        # Create player filters
-        player_filters = [df["player_name"] == player for player in team_players]
-        combined_player_filter = player_filters[0]
-        for f in player_filters[1:]:
-            combined_player_filter = combined_player_filter | f
-        
         # Apply stat filters if any
         if found_stats:
-            stat_filters = [df["stat_type"].str.lower() == stat.lower() for stat in found_stats]
-            combined_stat_filter = stat_filters[0]
-            for f in stat_filters[1:]:
-                combined_stat_filter = combined_stat_filter | f
-            
-            filtered_df = df[combined_player_filter & combined_stat_filter]
+            positions = [
+                pos
+                for player in team_players
+                for stat in found_stats
+                for pos in line_index.player_stat(player, stat)
+            ]
             result_desc = f"{team_code} {', '.join(found_stats)}"
         else:
-            filtered_df = df[combined_player_filter]
+            positions = [pos for player in team_players for pos in line_index.player(player)]
             result_desc = f"{team_code} players"
         
+        filtered_df = df.iloc[sorted(set(positions))]
+        
         return filtered_df, result_desc
     
     def _filter_by_player_and_stats(self, player_name, stats):
         """Filter betting lines by player and stats."""
-        player_filter = df["player_name"] == player_name
-        stat_filters = [df["stat_type"].str.lower() == stat.lower() for stat in stats]
-        
-        combined_stat_filter = stat_filters[0]
-        for f in stat_filters[1:]:
-            combined_stat_filter = combined_stat_filter | f
-        
-        return df[player_filter & combined_stat_filter]
+        positions = [pos for stat in stats for pos in line_index.player_stat(player_name, stat)]
+        return df.iloc[sorted(set(positions))]
     
     def _filter_by_stats(self, stats):
         """Filter betting lines by stats only."""
-        stat_filters = [df["stat_type"].str.lower() == stat.lower() for stat in stats]
-        combined_filter = stat_filters[0]
-        
-        for f in stat_filters[1:]:
-            combined_filter = combined_filter | f
-            
-        return df[combined_filter]
+        positions = [pos for stat in stats for pos in line_index.stat(stat)]
+        return df.iloc[sorted(set(positions))]
 
-class PlayerSearchModal(ui.Modal, title="Search for a Player"):
+class PlayerSearchModal(ReadyModal, title="Search for a Player"):
     search_query = ui.TextInput(label="Player Name", placeholder="Enter player name (e.g., Steph Curry)", required=True)
     
     async def on_submit(self, interaction: discord.Interaction):
         query = self.search_query.value
+        # The resolver may ask GPT, which can take longer than Discord waits for a response
+        await interaction.response.defer()
         
         # Try to resolve the player name using the existing function
-        resolved_player = resolve_player_name(query)
+        resolved_player = await resolve_player(query, owner=str(interaction.user.id), deadline=llm_deadline())
         
         if resolved_player:
             # If we got a direct match from the resolver
-            filtered_df = df[df["player_name"] == resolved_player]
-            await interaction.response.defer()
+            filtered_df = df.iloc[line_index.player(resolved_player)]
             
             # Show the results
             await interaction.channel.send(f"🔍 **Showing lines for Player: {resolved_player}**")
-            image_path = generate_table_image(filtered_df)
-            await interaction.channel.send(file=discord.File(image_path))
+            image_file = await generate_table_image(filtered_df)
+            await interaction.channel.send(file=image_file)
             
             # Show browse options again
             browse_view = BrowseLinesView()
@@ -944,7 +959,7 @@ class PlayerSearchModal(ui.Modal, title="Search for a Player"):
         
         # If resolver didn't find a match, fall back to manual search
         query_lower = query.lower()
-        all_players = df["player_name"].unique()
+        all_players = line_index.players()
         
         # Sort matches by relevance (exact matches first, then starts with, then contains)
         exact_matches = [p for p in all_players if p.lower() == query_lower]
@@ -954,7 +969,7 @@ class PlayerSearchModal(ui.Modal, title="Search for a Player"):
         matching_players = exact_matches + starts_with + contains
         
         if not matching_players:
-            await interaction.response.send_message(f"No players found matching '{query}'", ephemeral=True)
+            await interaction.followup.send(f"No players found matching '{query}'", ephemeral=True)
             return
         
         # Create a dropdown with the matching players
@@ -964,10 +979,10 @@ class PlayerSearchModal(ui.Modal, title="Search for a Player"):
         if len(matching_players) > 25:
             # Just show the top 25 most relevant matches
             options = [discord.SelectOption(label=player, value=player) for player in matching_players[:25]]
-            await interaction.response.send_message(f"Found {len(matching_players)} players matching '{query}'. Showing top 25 matches:", ephemeral=True)
+            await interaction.followup.send(f"Found {len(matching_players)} players matching '{query}'. Showing top 25 matches:", ephemeral=True)
         else:
             options = [discord.SelectOption(label=player, value=player) for player in matching_players]
-            await interaction.response.send_message(f"Found {len(matching_players)} players matching '{query}':", ephemeral=True)
+            await interaction.followup.send(f"Found {len(matching_players)} players matching '{query}':", ephemeral=True)
         
         # Create a custom select with the search results
         select = ui.Select(placeholder="Select a player from search results", options=options)
@@ -976,14 +991,14 @@ class PlayerSearchModal(ui.Modal, title="Search for a Player"):
             selected_player = select_interaction.data["values"][0]
             
             # Get the betting lines for this player
-            filtered_df = df[df["player_name"] == selected_player]
+            filtered_df = df.iloc[line_index.player(selected_player)]
             
             await select_interaction.response.defer()
             
             # Show the results
             await interaction.channel.send(f"🔍 **Showing lines for Player: {selected_player}**")
-            image_path = generate_table_image(filtered_df)
-            await interaction.channel.send(file=discord.File(image_path))
+            image_file = await generate_table_image(filtered_df)
+            await interaction.channel.send(file=image_file)
             
             # Show browse options again
             browse_view = BrowseLinesView()
@@ -993,7 +1008,7 @@ class PlayerSearchModal(ui.Modal, title="Search for a Player"):
         view.add_item(select)
         await interaction.channel.send("Select a player from the search results:", view=view)
 
-class StatSearchModal(ui.Modal, title="Search for a Stat Type"):
+class StatSearchModal(ReadyModal, title="Search for a Stat Type"):
     search_query = ui.TextInput(label="Stat Type", placeholder="Enter stat type (e.g., points, assists)", required=True)
     
     async def on_submit(self, interaction: discord.Interaction):
@@ -1028,14 +1043,14 @@ class StatSearchModal(ui.Modal, title="Search for a Stat Type"):
             selected_stat = exact_matches[0] if exact_matches else matching_stats[0]
             
             # Get the betting lines for this stat type
-            filtered_df = df[df["stat_type"].str.lower() == selected_stat.lower()]
+            filtered_df = df.iloc[line_index.stat(selected_stat)]
             
             await interaction.response.defer()
             
             # Show the results directly
             await interaction.channel.send(f"🔍 **Showing lines for Stat Type: {selected_stat}**")
-            image_path = generate_table_image(filtered_df)
-            await interaction.channel.send(file=discord.File(image_path))
+            image_file = await generate_table_image(filtered_df)
+            await interaction.channel.send(file=image_file)
             
             # Show browse options again
             browse_view = BrowseLinesView()
@@ -1057,14 +1072,14 @@ class StatSearchModal(ui.Modal, title="Search for a Stat Type"):
                 selected_stat = select_interaction.data["values"][0]
                 
                 # Get the betting lines for this stat type
-                filtered_df = df[df["stat_type"] == selected_stat]
+                filtered_df = df.iloc[line_index.stat(selected_stat)]
                 
                 await select_interaction.response.defer()
                 
                 # Show the results
                 await interaction.channel.send(f"🔍 **Showing lines for Stat Type: {selected_stat}**")
-                image_path = generate_table_image(filtered_df)
-                await interaction.channel.send(file=discord.File(image_path))
+                image_file = await generate_table_image(filtered_df)
+                await interaction.channel.send(file=image_file)
                 
                 # Show browse options again
                 browse_view = BrowseLinesView()
@@ -1076,7 +1091,7 @@ class StatSearchModal(ui.Modal, title="Search for a Stat Type"):
         else:
             await interaction.response.send_message(f"No stat types found matching '{self.search_query.value}'", ephemeral=True)
 
-class BrowseLinesView(ui.View):
+class BrowseLinesView(ReadyView):
     def __init__(self):
         super().__init__(timeout=None)
         # Add dropdown for popular options
@@ -1111,7 +1126,7 @@ class BrowseLinesView(ui.View):
         # Show main menu
         await interaction.channel.send("Main Menu:", view=MainMenuView())
 
-class ExitSearchView(ui.View):
+class ExitSearchView(ReadyView):
     def __init__(self):
         super().__init__(timeout=None)
     
@@ -1131,7 +1146,7 @@ class ExitSearchView(ui.View):
         await interaction.channel.send("Main Menu:", view=MainMenuView())
 
 # Main menu view with buttons for search and place bets
-class MainMenuView(ui.View):
+class MainMenuView(ReadyView):
     def __init__(self):
         super().__init__(timeout=None)
     
@@ -1193,7 +1208,7 @@ class LoginView(ui.View):
         # Create a modal for login
         await interaction.response.send_modal(LoginModal())
         
-class NaturalBetView(ui.View):
+class NaturalBetView(ReadyView):
     def __init__(self):
         super().__init__(timeout=None)
     
@@ -1224,8 +1239,8 @@ class NaturalBetView(ui.View):
         ]
         
         # Generate and display the cart image
-        cart_image = generate_bet_confirmation_image(display_data, "Pending", filename="cart_preview.png")
-        await interaction.channel.send(f"🛒 **Your Cart** - {len(user_cart)} bets", file=discord.File(cart_image))
+        cart_image = await generate_bet_confirmation_image(display_data, "Pending", filename="cart_preview.png")
+        await interaction.channel.send(f"🛒 **Your Cart** - {len(user_cart)} bets", file=cart_image)
         
         # Show cart management options
         view = CartManagementView(user_id)
@@ -1247,7 +1262,7 @@ class NaturalBetView(ui.View):
         await interaction.channel.send("Main Menu:", view=MainMenuView())
 
 # Combined betting and cart view
-class BettingWithCartView(ui.View):
+class BettingWithCartView(ReadyView):
     def __init__(self, user_id):
         super().__init__(timeout=None)
         self.user_id = user_id
@@ -1286,8 +1301,8 @@ class BettingWithCartView(ui.View):
         ]
         
         # Generate and display the cart image
-        cart_image = generate_bet_confirmation_image(display_data, "Pending", filename="cart_preview.png")
-        await interaction.channel.send(f"🛒 **Your Cart** - {len(user_cart)} bets", file=discord.File(cart_image))
+        cart_image = await generate_bet_confirmation_image(display_data, "Pending", filename="cart_preview.png")
+        await interaction.channel.send(f"🛒 **Your Cart** - {len(user_cart)} bets", file=cart_image)
         
         # Show cart management options
         view = CartManagementView(self.user_id)
@@ -1311,7 +1326,7 @@ class BettingWithCartView(ui.View):
         await interaction.channel.send("Main Menu:", view=MainMenuView())
 
 # Cart management view
-class CartManagementView(ui.View):
+class CartManagementView(ReadyView):
     def __init__(self, user_id):
         super().__init__(timeout=None)
         self.user_id = user_id
@@ -1376,7 +1391,7 @@ class CartManagementView(ui.View):
 # BetAmountView class has been removed as requested
 
 # Follow-up question button UI with specific labels
-class FollowUpView(ui.View):
+class FollowUpView(ReadyView):
     def __init__(self, user_id):
         super().__init__(timeout=None)
         self.user_id = user_id
@@ -1449,7 +1464,7 @@ class FollowUpView(ui.View):
         await interaction.channel.send("Click the button below to place a bet:", view=view)
 
 # Player name modal
-class PlayerNameModal(ui.Modal, title="Player Selection"):
+class PlayerNameModal(ReadyModal, title="Player Selection"):
     player_name = ui.TextInput(
         label="Player Name", 
         placeholder="Enter NBA player name (e.g., LeBron James, Curry)",
@@ -1477,7 +1492,7 @@ class PlayerNameModal(ui.Modal, title="Player Selection"):
         await process_bet_input("", user_id, channel)
 
 # Stat type modal
-class StatTypeModal(ui.Modal, title="Stat Type Selection"):
+class StatTypeModal(ReadyModal, title="Stat Type Selection"):
     stat_type = ui.TextInput(
         label="Stat Type", 
         placeholder="Enter stat type (e.g., points, rebounds, assists)",
@@ -1505,7 +1520,7 @@ class StatTypeModal(ui.Modal, title="Stat Type Selection"):
         await process_bet_input("", user_id, channel)
 
 # Line value modal
-class LineValueModal(ui.Modal, title="Line Value Selection"):
+class LineValueModal(ReadyModal, title="Line Value Selection"):
     line_value = ui.TextInput(
         label="Line Value", 
         placeholder="Enter the line value (e.g., 25.5)",
@@ -1533,7 +1548,7 @@ class LineValueModal(ui.Modal, title="Line Value Selection"):
         await process_bet_input("", user_id, channel)
 
 # Bet type modal
-class BetTypeModal(ui.Modal, title="Bet Type Selection"):
+class BetTypeModal(ReadyModal, title="Bet Type Selection"):
     bet_type = ui.TextInput(
         label="Bet Type", 
         placeholder="Type either 'over' or 'under'",
@@ -1569,7 +1584,7 @@ class BetTypeModal(ui.Modal, title="Bet Type Selection"):
 # Entry fee modal has been removed as requested
         
 # Bet modal UI class with improved instructions
-class BetModal(ui.Modal, title="Place Your Bet"):
+class BetModal(ReadyModal, title="Place Your Bet"):
     bet_text = ui.TextInput(
         label="Describe your bet", 
         placeholder="Example: $20 on LeBron over 25.5 points",
@@ -1661,7 +1676,57 @@ async def handle_verification(message):
 
 
 # --- Utilities ---
-def extract_bet_info(user_input):
+async def extract_bet_info(user_input, owner=None, deadline=None):
+    # Typical slips parse locally; only the legs the parser can't read go to GPT
+    bet_data, unparsed = parse_bet_slip(user_input, player_matcher, list(line_index.by_stat),
+                                        threshold=PLAYER_MATCH_THRESHOLD)
+    unreadable = []
+    if len(unparsed) == len(bet_data["players"]):
+        parsed_data = await extract_bet_info_llm(user_input, owner=owner, deadline=deadline)
+    elif unparsed:
+        llm_data = await extract_bet_info_llm(" and ".join(unparsed), owner=owner, deadline=deadline)
+        if llm_data is None:
+            # Keep the legs that parsed; the rest are reported like unknown players
+            llm_data = {"players": []}
+            unreadable = list(unparsed)
+        llm_players = iter(llm_data.get("players") or [])
+        parsed_data = {
+            "entry_fee": bet_data["entry_fee"] if bet_data["entry_fee"] is not None else llm_data.get("entry_fee"),
+            "players": [leg if leg is not None else next(llm_players, None) for leg in bet_data["players"]],
+        }
+        parsed_data["players"] = [leg for leg in parsed_data["players"] if leg is not None] + list(llm_players)
+    else:
+        parsed_data = bet_data
+    if parsed_data is None:
+        return None
+
+    # Validate player names against the database
+    if "players" in parsed_data and parsed_data["players"]:
+        valid_players = []
+        invalid_players = list(unreadable)
+        
+        for player in parsed_data["players"]:
+            if player.get("name"):
+                player_name = player["name"]
+                
+                # Check if player exists in the database (case-insensitive)
+                db_name = line_index.canonical_player(player_name)
+                if db_name:
+                    player["name"] = db_name  # Use the exact name from the database
+                    valid_players.append(player)
+                else:
+                    # Player not found in database
+                    invalid_players.append(player_name)
+        
+        # Update the parsed data with validation results
+        if invalid_players:
+            parsed_data["invalid_players"] = invalid_players
+        parsed_data["players"] = valid_players
+    
+    return parsed_data
+
+
+async def extract_bet_info_llm(user_input, owner=None, deadline=None):
     prompt = f"""
 You are an API that extracts structured bet information from user input. You MUST return a valid JSON object only — no explanation, no commentary.
 
@@ -1706,17 +1771,19 @@ User Input:
 Now respond ONLY with a valid JSON object in that format.
 """
 
-    response = client_ai.chat.completions.create(
-        model="gpt-4o",
-        messages=[
-            {"role": "system", "content": "You are a JSON-only API. Never include explanations."},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0.0,
-    )
-    
-    # Try parsing the response
-    response_text = response.choices[0].message.content.strip()
+    try:
+        response_text = await llm.complete(
+            [
+                {"role": "system", "content": "You are a JSON-only API. Never include explanations."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.0,
+            owner=owner,
+            deadline=llm_deadline(deadline),
+        )
+    except Exception as e:
+        print(f"❌ GPT bet extraction error: {e}")
+        return None
     
     # Remove markdown formatting if present
     if response_text.startswith("```json") and response_text.endswith("```"):
@@ -1725,87 +1792,60 @@ Now respond ONLY with a valid JSON object in that format.
         response_text = response_text[3:-3].strip()
 
     try:
-        # Parse the JSON to validate it
         parsed_data = json.loads(response_text)
-        
-        # Validate player names against the database
-        if "players" in parsed_data and parsed_data["players"]:
-            valid_players = []
-            invalid_players = []
-            
-            # Get all player names from the database
-            all_player_names = df["player_name"].unique()
-            all_player_names_lower = [name.lower() for name in all_player_names]
-            
-            for player in parsed_data["players"]:
-                if player.get("name"):
-                    player_name = player["name"]
-                    
-                    # Check if player exists in the database (case-insensitive)
-                    if player_name.lower() in all_player_names_lower:
-                        # Find the exact case-matching name from the database
-                        for db_name in all_player_names:
-                            if db_name.lower() == player_name.lower():
-                                player["name"] = db_name  # Use the exact name from the database
-                                valid_players.append(player)
-                                break
-                    else:
-                        # Player not found in database
-                        invalid_players.append(player_name)
-            
-            # Update the parsed data with validation results
-            if invalid_players:
-                parsed_data["invalid_players"] = invalid_players
-            parsed_data["players"] = valid_players
-        
-        return parsed_data
     except json.JSONDecodeError:
         # If parsing fails, return None
         return None
+    return parsed_data if isinstance(parsed_data, dict) else None
 
-def get_filtered_rows(user_query):
-    try:
-        prompt = f"""
-You are a smart NBA betting assistant. Given a user query and a list of betting lines, return only the entries that match the filters based on CURRENT NBA knowledge.
+async def get_filter_spec(user_query, owner=None, deadline=None):
+    """Turn a search query into a filter spec, parsing locally and asking GPT only if needed."""
+    stat_keys = list(line_index.by_stat)
+    spec = parse_filter_query(user_query, player_matcher, stat_keys, threshold=PLAYER_MATCH_THRESHOLD)
+    if spec is not None:
+        return spec
+
+    # GPT only ever sees the query and a fixed vocabulary, never the lines themselves
+    prompt = f"""
+You are a smart NBA betting assistant. Convert the user's search query into a JSON filter.
 
 ⚠️ STRICT RULES:
-1. If the query mentions a team (e.g., "Nuggets", "Lakers"), include only players who currently play for that team.
-2. Use current NBA rosters (as of today).
-3. If the query includes **multiple filters**, like teams and players or multiple stat types, return the **union** of all matching conditions.
-4. Normalize stat types (e.g., "rebound" → "rebounds", "assist" → "assists").
-5. If stat type or team is implied but not explicitly named, infer reasonably.
-6. Output must be a **valid JSON array**. No explanations, no markdown, no extra text.
-7. If nothing matches, return [].
-
-Examples of filterable properties:
-- Player name
-- Team name (must be filtered to current roster)
-- Stat type (rebounds, points, assists, etc.)
+1. "players": full names of NBA players the query mentions (resolve nicknames).
+2. "teams": 3-letter codes of teams whose players the query asks for (e.g., "Lakers" → "LAL").
+3. "opponents": 3-letter codes of teams the players should be playing against ("vs Boston" → "BOS").
+4. "stats": stat types from this list only: {json.dumps(stat_keys)}. Normalize (e.g., "rebound" → "rebounds").
+5. "min_line" / "max_line": numeric bounds on the line value, or null.
+6. "all": true only if the query asks for every line with no other filter.
+7. Output must be a single valid JSON object. No explanations, no markdown, no extra text.
 
 User Query:
 {user_query}
 
-Betting Events (list of dicts):
-{df[['player_name', 'stat_type', 'line_value', 'opponent']].to_dict(orient='records')}
-
-Your response: JSON array of matched betting events (dicts). Nothing else.
+Your response: {{"players": [], "teams": [], "opponents": [], "stats": [], "min_line": null, "max_line": null, "all": false}}
 """
 
-        response = client_ai.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0
-        )
+    response_text = await llm.ask(
+        prompt, owner=owner, deadline=llm_deadline(deadline),
+        cache_key=resolution_key("filter", user_query),
+    )
+    if response_text.startswith("```json") and response_text.endswith("```"):
+        response_text = response_text[7:-3].strip()
+    elif response_text.startswith("```") and response_text.endswith("```"):
+        response_text = response_text[3:-3].strip()
+    if not response_text.startswith("{"):
+        raise ValueError("GPT response did not return a JSON object")
+
+    return spec_from_json(json.loads(response_text), player_matcher, stat_keys, threshold=PLAYER_MATCH_THRESHOLD)
 
-        response_text = response.choices[0].message.content.strip()
-        if response_text.startswith("```json") and response_text.endswith("```"):
-            response_text = response_text[7:-3].strip()
-        elif response_text.startswith("```") and response_text.endswith("```"):
-            response_text = response_text[3:-3].strip()
-        if not response_text.startswith("["):
-            raise ValueError("GPT response did not return JSON list")
 
-        return pd.DataFrame(json.loads(response_text))
+async def get_filtered_rows(user_query, owner=None, deadline=None):
+    try:
+        spec = await get_filter_spec(user_query, owner=owner, deadline=deadline)
+        rosters = {}
+        for team_code in spec["teams"]:
+            team_result = await get_team_players(team_code, owner=owner, deadline=deadline)
+            rosters[team_code] = team_result["players"] if team_result else []
+        return apply_filter(spec, df, line_index, rosters)
 
     except Exception as e:
         print("❌ GPT filter error:", e)
@@ -1813,76 +1853,19 @@ Your response: JSON array of matched betting events (dicts). Nothing else.
 
 
 
-def generate_table_image(filtered_df, filename="lines_preview.png"):
-    # Set the style for the plot
-    plt.style.use('ggplot')
-    
-    # Create figure with a dark background
-    fig, ax = plt.subplots(figsize=(12, min(0.6 * len(filtered_df) + 1.5, 25)))
-    fig.patch.set_facecolor('#2C2F33')  # Discord-like dark background
-    ax.set_facecolor('#2C2F33')
-    ax.axis('off')
-    
-    # Add a title with NBA-themed styling
-    ax.set_title('NBA Prop Betting Lines', fontsize=16, color='white', fontweight='bold', pad=20)
-    
-    # Prepare data for the table
-    column_titles = ["Player", "Stat Type", "Line", "Opponent"]
+async def generate_table_image(filtered_df, filename="lines_preview.png", renderer=None):
+    renderer = renderer or IMAGE_RENDERER
     table_data = filtered_df[["player_name", "stat_type", "line_value", "opponent"]].values.tolist()
-    
-    # Create the table with custom styling
-    table = ax.table(
-        cellText=table_data, 
-        colLabels=column_titles, 
-        loc='center', 
-        cellLoc='center',
-        colWidths=[0.3, 0.25, 0.15, 0.3]  # Adjust column widths for better proportions
-    )
-    
-    # Style the table
-    table.auto_set_font_size(False)
-    table.set_fontsize(11)
-    table.scale(1.2, 1.5)
-    
-    # Style header row (team colors - using Lakers purple and gold as inspiration)
-    header_color = '#552583'  # Lakers purple
-    header_text_color = '#FDB927'  # Lakers gold
-    
-    for col in range(len(column_titles)):
-        cell = table[0, col]
-        cell.set_facecolor(header_color)
-        cell.set_text_props(color=header_text_color, weight='bold')
-        cell.set_edgecolor('white')
-    
-    # Style data rows with alternating colors for better readability
-    for row in range(1, len(table_data) + 1):
-        row_color = '#36393F' if row % 2 == 0 else '#40444B'  # Discord-like alternating row colors
-        
-        for col in range(len(column_titles)):
-            cell = table[row, col]
-            cell.set_facecolor(row_color)
-            cell.set_text_props(color='white')
-            cell.set_edgecolor('#23272A')  # Darker border color
-    
-    # Add a subtle border around the entire table
-    for pos, cell in table._cells.items():
-        cell.set_linewidth(0.5)
-    
-    # Add a subtle NBA-themed watermark/logo hint at the bottom
-    fig.text(
-        0.5, 0.02, 
-        "StrikeBot NBA Props", 
-        ha='center', 
-        color='#FDB927', 
-        alpha=0.7,
-        fontsize=10,
-        fontweight='bold'
-    )
-    
-    # Save with high quality
-    plt.savefig(filename, bbox_inches='tight', dpi=200, facecolor=fig.get_facecolor())
-    plt.close(fig)
-    return filename
+
+    # Reuse the last render of the same rows if we have one
+    cache_key = RenderCache.make_key("lines_table", renderer, table_data)
+    image_bytes = render_cache.get(cache_key)
+    if image_bytes is None:
+        image_bytes = await render_service.render(render_lines_table_png, table_data, renderer)
+        render_cache.put(cache_key, image_bytes)
+
+    # Hand Discord an in-memory attachment; nothing touches the filesystem
+    return discord.File(io.BytesIO(image_bytes), filename=filename)
 
 
 
@@ -1899,12 +1882,8 @@ def generate_bets_payload(user_id, entry_fee, user_cart):
         stat_type = bet.get("stat_type")
         line_value = bet.get("line_value")
 
-        # Lookup event_id from the CSV using player name, stat type, and line value
-        matching_event = df[(df["player_name"] == player_name) &
-                                           (df["stat_type"].str.lower() == stat_type.lower()) &
-                                           (df["line_value"] == line_value)]
-
-        event_id = matching_event.iloc[0]["event_id"] if not matching_event.empty else None
+        # Lookup event_id from the line index using player name, stat type, and line value
+        event_id = line_index.event_id(player_name, stat_type, line_value)
 
         bets.append({
             "event_id": event_id,
@@ -1931,7 +1910,12 @@ def generate_bets_payload(user_id, entry_fee, user_cart):
 # --- Events ---
 @client.event
 async def on_ready():
+    global roster_prewarm
     print(f"✅ Logged in as {client.user}")
+    # Fetch any rosters we don't have on disk yet so team searches are lookups
+    missing_teams = roster_store.missing()
+    if missing_teams and (roster_prewarm is None or roster_prewarm.done()):
+        roster_prewarm = asyncio.create_task(refresh_rosters(missing_teams))
     for guild in client.guilds:
         for channel in guild.text_channels:
             if channel.permissions_for(guild.me).send_messages:
@@ -1975,6 +1959,8 @@ async def on_message(message):
     if text == "exit":
         current_mode = user_modes.get(user_id)
         user_modes[user_id] = None
+        # Abandon any GPT calls still running for this user's previous messages
+        llm.cancel(user_id)
         guided_bet_state[user_id] = {}
     
         if current_mode == "search":
@@ -1992,6 +1978,21 @@ async def on_message(message):
         return
 
 
+    # Everything below needs the lines table
+    await wait_for_lines(message.channel)
+
+    if text == "refresh rosters":
+        if ROSTER_ADMIN_IDS and user_id not in ROSTER_ADMIN_IDS:
+            await message.channel.send("⛔ You're not allowed to refresh team rosters.")
+            return
+        await message.channel.send("🔄 Refreshing team rosters...")
+        failed = await refresh_rosters()
+        if failed:
+            await message.channel.send(f"⚠️ Rosters refreshed, but these teams failed: {', '.join(failed)}")
+        else:
+            await message.channel.send("✅ All team rosters refreshed.")
+        return
+
     if text == "place bets":
         # Show the natural language bet input UI instead of the guided flow
         user_modes[user_id] = "nlp_bet"
@@ -2026,8 +2027,8 @@ async def on_message(message):
         ]
         
         # Generate and display the cart image
-        cart_image = generate_bet_confirmation_image(display_data, "Pending", filename="cart_preview.png")
-        await message.channel.send(f"🛒 **Your Cart** - {len(user_cart)} bets", file=discord.File(cart_image))
+        cart_image = await generate_bet_confirmation_image(display_data, "Pending", filename="cart_preview.png")
+        await message.channel.send(f"🛒 **Your Cart** - {len(user_cart)} bets", file=cart_image)
         
         # Show cart options
         await message.channel.send("Type `confirm cart` to set your wager and place these bets, or `clear cart` to start over.")
@@ -2079,6 +2080,7 @@ async def process_nlp_bet(message, user_id, channel):
     # Handle exit command
     if message.content.strip().lower() == "exit":
         user_modes[user_id] = None
+        llm.cancel(user_id)
         if user_id in user_nlp_bet_state:
             del user_nlp_bet_state[user_id]
         await channel.send("✅ Exited betting mode.")
@@ -2115,7 +2117,7 @@ async def process_bet_input(bet_input, user_id, channel):
     # Check if we're in the special flow after Add Another Bet was clicked
     if state.get("waiting_for_nlp_input", False) and bet_input:
         # User has provided a bet after clicking Add Another Bet
-        bet_data = extract_bet_info(bet_input)
+        bet_data = await extract_bet_info(bet_input, owner=user_id)
         
         if bet_data and "players" in bet_data and bet_data["players"]:
             # Reset the state for processing this new bet
@@ -2144,11 +2146,10 @@ async def process_bet_input(bet_input, user_id, channel):
                 await channel.send(error_msg)
                 
                 # Show suggestions for similar player names if possible
-                all_players = df["player_name"].unique()
                 suggestions = []
                 
                 for invalid_name in invalid_names:
-                    matches = get_close_matches(invalid_name, all_players, n=3, cutoff=0.6)
+                    matches = player_matcher.suggest(invalid_name, n=3)
                     if matches:
                         suggestions.extend(matches)
                 
@@ -2197,7 +2198,7 @@ async def process_bet_input(bet_input, user_id, channel):
     else:
         # This is a new bet input, extract information
         if bet_input:
-            bet_data = extract_bet_info(bet_input)
+            bet_data = await extract_bet_info(bet_input, owner=user_id)
             print(f"New bet input. Extracted data: {bet_data}")
             
             if not bet_data:
@@ -2211,11 +2212,10 @@ async def process_bet_input(bet_input, user_id, channel):
                 await channel.send(error_msg)
                 
                 # Show suggestions for similar player names if possible
-                all_players = df["player_name"].unique()
                 suggestions = []
                 
                 for invalid_name in invalid_names:
-                    matches = get_close_matches(invalid_name, all_players, n=3, cutoff=0.6)
+                    matches = player_matcher.suggest(invalid_name, n=3)
                     if matches:
                         suggestions.extend(matches)
                 
@@ -2341,11 +2341,9 @@ async def validate_and_complete_player_bet(player_data, user_id, channel):
     if player_data.get("name") is None or current_field == "name":
         if current_field == "name":
             # Try to resolve with user input
-            player_names = df["player_name"].unique()
-            matched = get_close_matches(state.get("last_input", ""), player_names, n=1, cutoff=0.6)
-            resolved_name = matched[0] if matched else resolve_player_name(state.get("last_input", ""))
+            resolved_name = await resolve_player(state.get("last_input", ""), owner=user_id)
             
-            if resolved_name and resolved_name in df["player_name"].values:
+            if resolved_name and line_index.canonical_player(resolved_name):
                 player_data["name"] = resolved_name
                 state["current_field"] = None  # Clear current field
             else:
@@ -2362,7 +2360,7 @@ async def validate_and_complete_player_bet(player_data, user_id, channel):
     if player_data.get("stat_type") is None or current_field == "stat_type":
         if current_field == "stat_type":
             # Try to resolve with user input
-            valid_stats = df[df["player_name"] == player_data["name"]]["stat_type"].unique()
+            valid_stats = line_index.stats_for(player_data["name"])
             matched = get_close_matches(state.get("last_input", "").lower(), [s.lower() for s in valid_stats], n=1, cutoff=0.6)
             
             if matched:
@@ -2385,9 +2383,7 @@ async def validate_and_complete_player_bet(player_data, user_id, channel):
             try:
                 val = float(state.get("last_input", ""))
                 # Get available lines for this player and stat type
-                player_filter = df["player_name"] == player_data["name"]
-                stat_filter = df["stat_type"].str.lower() == player_data["stat_type"].lower()
-                available_lines = df[player_filter & stat_filter]["line_value"].unique()
+                available_lines = line_index.lines_for(player_data["name"], player_data["stat_type"])
                 
                 # Check if the requested line exists
                 if len(available_lines) == 0:
@@ -2418,9 +2414,7 @@ async def validate_and_complete_player_bet(player_data, user_id, channel):
                 return True
         else:
             # Show available lines with UI button
-            player_filter = df["player_name"] == player_data["name"]
-            stat_filter = df["stat_type"].str.lower() == player_data["stat_type"].lower()
-            available_lines = df[player_filter & stat_filter]["line_value"].unique()
+            available_lines = line_index.lines_for(player_data["name"], player_data["stat_type"])
             
             if len(available_lines) == 0:
                 await channel.send(f"❌ No betting lines available for {player_data['name']} {player_data['stat_type']}.")
@@ -2459,7 +2453,7 @@ async def validate_and_complete_player_bet(player_data, user_id, channel):
     return False
 
 # View for actions after bet confirmation with improved options
-class PostBetActionView(ui.View):
+class PostBetActionView(ReadyView):
     def __init__(self, user_id):
         super().__init__(timeout=None)
         self.user_id = user_id
@@ -2510,8 +2504,8 @@ class PostBetActionView(ui.View):
         ]
         
         # Generate and display the cart image
-        cart_image = generate_bet_confirmation_image(display_data, "Pending", filename="cart_preview.png")
-        await interaction.channel.send(f"🛒 **Your Cart** - {len(user_cart)} bets", file=discord.File(cart_image))
+        cart_image = await generate_bet_confirmation_image(display_data, "Pending", filename="cart_preview.png")
+        await interaction.channel.send(f"🛒 **Your Cart** - {len(user_cart)} bets", file=cart_image)
         
         # Show cart management options
         view = CartManagementView(self.user_id)
@@ -2547,7 +2541,7 @@ class PostBetActionView(ui.View):
         await interaction.channel.send("🔙 Returning to Main Menu:", view=MainMenuView())
 
 # Confirmation view for finalizing bets
-class BetAmountView(ui.View):
+class BetAmountView(ReadyView):
     def __init__(self, user_id):
         super().__init__(timeout=None)
         self.user_id = user_id
@@ -2598,7 +2592,7 @@ class BetAmountView(ui.View):
         modal = EntryFeeModal(self.user_id)
         await interaction.response.send_modal(modal)
 
-class EntryFeeModal(ui.Modal, title="Enter Bet Amount"):
+class EntryFeeModal(ReadyModal, title="Enter Bet Amount"):
     entry_fee = ui.TextInput(label="Amount (in $)", placeholder="Enter amount (e.g., 25)", required=True)
     
     def __init__(self, user_id):
@@ -2617,7 +2611,7 @@ class EntryFeeModal(ui.Modal, title="Enter Bet Amount"):
         except ValueError:
             await interaction.response.send_message("❌ Please enter a valid number.", ephemeral=True)
 
-class FinalConfirmationView(ui.View):
+class FinalConfirmationView(ReadyView):
     def __init__(self, user_id, bet_amount):
         super().__init__(timeout=None)
         self.user_id = user_id
@@ -2650,7 +2644,7 @@ class FinalConfirmationView(ui.View):
         view = MainMenuView()
         await interaction.channel.send("Main Menu:", view=view)
 
-class BetConfirmationView(ui.View):
+class BetConfirmationView(ReadyView):
     def __init__(self, user_id, bet_data):
         super().__init__(timeout=None)
         self.user_id = user_id
@@ -2695,8 +2689,8 @@ class BetConfirmationView(ui.View):
         
         # Generate and display the cart image
         entry_fee = user_cart[0]["entry_fee"] if user_cart else "Pending"
-        cart_image = generate_bet_confirmation_image(display_data, entry_fee, filename="cart_preview.png")
-        await interaction.channel.send(f"🛒 **Your Current Cart** - {len(user_cart)} bet{'s' if len(user_cart) > 1 else ''}:", file=discord.File(cart_image))
+        cart_image = await generate_bet_confirmation_image(display_data, entry_fee, filename="cart_preview.png")
+        await interaction.channel.send(f"🛒 **Your Current Cart** - {len(user_cart)} bet{'s' if len(user_cart) > 1 else ''}:", file=cart_image)
         
         # Show cart management options
         view = CartManagementView(self.user_id)
@@ -2743,8 +2737,8 @@ class BetConfirmationView(ui.View):
         ]
         
         # Generate and display the cart image
-        cart_image = generate_bet_confirmation_image(display_data, current_entry_fee, filename="full_cart_preview.png")
-        await channel.send(f"🛒 **Your Current Cart** - {len(user_cart)} bet{'s' if len(user_cart) > 1 else ''}", file=discord.File(cart_image))
+        cart_image = await generate_bet_confirmation_image(display_data, current_entry_fee, filename="full_cart_preview.png")
+        await channel.send(f"🛒 **Your Current Cart** - {len(user_cart)} bet{'s' if len(user_cart) > 1 else ''}", file=cart_image)
         
         # Show betting options instead of asking to type in chat
         view = BettingWithCartView(user_id)
@@ -2767,7 +2761,7 @@ class BetConfirmationView(ui.View):
         await interaction.channel.send("Main Menu:", view=MainMenuView())
 
 # View for selecting a line when the original line is invalid
-class LineSelectionView(ui.View):
+class LineSelectionView(ReadyView):
     def __init__(self, user_id, suggestion=None, available_lines=None):
         super().__init__(timeout=None)
         self.user_id = user_id
@@ -2799,7 +2793,7 @@ class LineSelectionView(ui.View):
         await interaction.channel.send("Click the button below to place a new bet:", view=view)
 
 # View for trying again when a bet has invalid lines
-class TryAgainBetView(ui.View):
+class TryAgainBetView(ReadyView):
     def __init__(self, user_id):
         super().__init__(timeout=None)
         self.user_id = user_id
@@ -2828,7 +2822,7 @@ class TryAgainBetView(ui.View):
         await interaction.channel.send("Main Menu:", view=MainMenuView())
 
 # View for adding another bet with options for entry fee
-class AddBetOptionsView(ui.View):
+class AddBetOptionsView(ReadyView):
     def __init__(self, user_id, current_fee=None):
         super().__init__(timeout=None)
         self.user_id = user_id
@@ -2862,8 +2856,8 @@ class AddBetOptionsView(ui.View):
             ]
             
             # Generate and display the cart image
-            cart_image = generate_bet_confirmation_image(display_data, None, filename="current_cart.png")
-            await interaction.channel.send(f"🛒 **Your Current Cart** - {len(user_cart)} bet{'s' if len(user_cart) > 1 else ''}", file=discord.File(cart_image))
+            cart_image = await generate_bet_confirmation_image(display_data, None, filename="current_cart.png")
+            await interaction.channel.send(f"🛒 **Your Current Cart** - {len(user_cart)} bet{'s' if len(user_cart) > 1 else ''}", file=cart_image)
         
         # Prompt for the new bet with clear instructions
         await interaction.channel.send("What would you like to bet on? Just tell me the player and stat.\n*For example: 'LeBron over 25.5 points' or 'Curry assists'*")
@@ -2901,8 +2895,8 @@ class AddBetOptionsView(ui.View):
         ]
         
         # Generate and display the cart image
-        cart_image = generate_bet_confirmation_image(display_data, None, filename="current_cart.png")
-        await interaction.channel.send(f"🛒 **Your Current Cart** - {len(user_cart)} bet{'s' if len(user_cart) > 1 else ''}", file=discord.File(cart_image))
+        cart_image = await generate_bet_confirmation_image(display_data, None, filename="current_cart.png")
+        await interaction.channel.send(f"🛒 **Your Current Cart** - {len(user_cart)} bet{'s' if len(user_cart) > 1 else ''}", file=cart_image)
         
         # Show cart management options
         view = CartManagementView(self.user_id)
@@ -2938,8 +2932,8 @@ class AddBetOptionsView(ui.View):
         ]
         
         # Generate and display the cart image
-        cart_image = generate_bet_confirmation_image(display_data, "Pending", filename="cart_preview.png")
-        await interaction.channel.send(f"🛒 **Your Cart** - {len(user_cart)} bets", file=discord.File(cart_image))
+        cart_image = await generate_bet_confirmation_image(display_data, "Pending", filename="cart_preview.png")
+        await interaction.channel.send(f"🛒 **Your Cart** - {len(user_cart)} bets", file=cart_image)
         
         # Show cart management options
         view = CartManagementView(self.user_id)
@@ -2970,8 +2964,8 @@ async def process_bet_amount(amount, user_id, channel):
     ]
     
     # Generate and display the cart image with entry fee
-    cart_image = generate_bet_confirmation_image(display_data, amount, filename="cart_with_amount.png")
-    await channel.send(f"🛒 **Your Cart** - {len(user_cart)} bet{'s' if len(user_cart) > 1 else ''} with ${amount} bet", file=discord.File(cart_image))
+    cart_image = await generate_bet_confirmation_image(display_data, amount, filename="cart_with_amount.png")
+    await channel.send(f"🛒 **Your Cart** - {len(user_cart)} bet{'s' if len(user_cart) > 1 else ''} with ${amount} bet", file=cart_image)
     
     # Show final confirmation view
     view = FinalConfirmationView(user_id, amount)
@@ -3000,8 +2994,8 @@ async def finalize_bet_with_amount(amount, user_id, channel):
     ]
     
     # Generate and display the cart image with entry fee
-    cart_image = generate_bet_confirmation_image(display_data, amount, filename="final_cart.png")
-    await channel.send(f"🎉 **Success!** Your bet of ${amount} has been confirmed!", file=discord.File(cart_image))
+    cart_image = await generate_bet_confirmation_image(display_data, amount, filename="final_cart.png")
+    await channel.send(f"🎉 **Success!** Your bet of ${amount} has been confirmed!", file=cart_image)
     
     # Show the API payload
     await channel.send(f"📦 Final payload sent to Strike API:\n```json\n{json.dumps(payload, indent=2)}\n```")
@@ -3044,8 +3038,8 @@ async def process_bet_confirmation(bet_data, user_id, channel):
     ]
     
     # Generate and display the full cart image (without entry fee)
-    full_cart_image = generate_bet_confirmation_image(full_display_data, None, filename="full_cart_preview.png")
-    await channel.send(f"🛒 **Your Cart** - {len(user_cart)} bet{'s' if len(user_cart) > 1 else ''}", file=discord.File(full_cart_image))
+    full_cart_image = await generate_bet_confirmation_image(full_display_data, None, filename="full_cart_preview.png")
+    await channel.send(f"🛒 **Your Cart** - {len(user_cart)} bet{'s' if len(user_cart) > 1 else ''}", file=full_cart_image)
     
     # Then ask for bet amount
     view = BetAmountView(user_id)
@@ -3067,12 +3061,8 @@ async def finalize_nlp_bet(bet_data, user_id, channel):
     # Final validation of all bet lines against the database
     invalid_bets = []
     for i, player in enumerate(bet_data["players"]):
-        player_filter = df["player_name"] == player["name"]
-        stat_filter = df["stat_type"].str.lower() == player["stat_type"].lower()
-        line_filter = df["line_value"] == player["line_value"]
-        
         # Check if this exact bet exists in the database
-        if df[player_filter & stat_filter & line_filter].empty:
+        if not line_index.has_line(player["name"], player["stat_type"], player["line_value"]):
             invalid_bets.append(i)
     
     # If there are invalid bets, notify the user and don't proceed
@@ -3130,12 +3120,15 @@ async def finalize_nlp_bet(bet_data, user_id, channel):
     ]
     
     # Generate and display only the full cart image (without entry fee)
-    full_cart_image = generate_bet_confirmation_image(full_display_data, None, filename="full_cart_preview.png")
-    await channel.send(f"🛒 **Your Cart** - {len(user_cart)} bet{'s' if len(user_cart) > 1 else ''}", file=discord.File(full_cart_image))
+    full_cart_image = await generate_bet_confirmation_image(full_display_data, None, filename="full_cart_preview.png")
+    await channel.send(f"🛒 **Your Cart** - {len(user_cart)} bet{'s' if len(user_cart) > 1 else ''}", file=full_cart_image)
     
     # Show confirmation buttons
     view = BetConfirmationView(user_id, bet_data)
     await channel.send("Would you like to confirm this bet, add another bet, or cancel?", view=view)
 
-# Run bot
-client.run(DISCORD_TOKEN)
+# Run bot (see main.py)
+def main():
+    client.run(DISCORD_TOKEN)
+    if lines_load_failed:
+        raise SystemExit("❌ Betting lines could not be loaded; exiting")
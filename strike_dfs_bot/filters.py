@@ -0,0 +1,239 @@
+"""Compact filter specs for line searches and their local execution.
+
+A search like "lakers rebounds over 8" becomes a small dict::
+
+    {"players": [], "teams": ["LAL"], "opponents": [], "stats": ["rebounds"],
+     "min_line": 8.0, "max_line": None, "all": False}
+
+which is applied against the ``LineIndex`` instead of sending the whole
+table to GPT. Players and teams select rows (their union); opponents, stats
+and the line range narrow them.
+"""
+import re
+
+from lazy import lazy_import
+from lines import normalize_key
+from teams import TEAM_ALIASES, TEAM_CODES, find_teams
+
+np = lazy_import("numpy")
+
+# Common stat abbreviations and variations ("to" is left out: too common a word in free text)
+STAT_ALIASES = {
+    "pts": "points", "point": "points", "scoring": "points",
+    "ast": "assists", "assist": "assists", "passing": "assists",
+    "reb": "rebounds", "rebound": "rebounds", "boards": "rebounds",
+    "blk": "blocks", "block": "blocks",
+    "stl": "steals", "steal": "steals",
+    "tov": "turnovers", "turnover": "turnovers",
+}
+
+# Words that carry no filter meaning in a search query
+FILLER_WORDS = {
+    "show", "me", "get", "give", "find", "list", "see", "view", "display", "what", "whats", "which",
+    "are", "is", "the", "a", "an", "for", "of", "on", "in", "with", "from", "any", "some", "please",
+    "lines", "line", "props", "prop", "bets", "bet", "odds", "player", "players", "stats", "stat",
+    "tonight", "today", "games", "game", "team", "teams", "available", "current", "up", "by",
+    "i", "want", "to", "can", "you", "there", "do", "have", "who",
+}
+
+# Words that on their own mean "no filter"
+ALL_WORDS = {"all", "every", "everything"}
+
+# Separators between independent parts of a query
+_SPLIT_PATTERN = re.compile(r"\s*(?:,|&|\+|/|\band\b|\bor\b|\bplus\b)\s*")
+
+_NUMBER = r"(\d+(?:\.\d+)?)"
+_RANGE_PATTERNS = [
+    (re.compile(rf"\bbetween\s+{_NUMBER}\s+(?:and|to|-)\s+{_NUMBER}"), "between"),
+    (re.compile(rf"(?:\bover|\babove|\bmore than|\bgreater than|\bat least|>=?)\s*{_NUMBER}"), "min"),
+    (re.compile(rf"(?:\bunder|\bbelow|\bless than|\bat most|<=?)\s*{_NUMBER}"), "max"),
+    (re.compile(rf"\b{_NUMBER}\s*\+"), "min"),
+]
+
+_OPPONENT_PREFIX = re.compile(r"\b(?:vs|v|versus|against|facing|playing)\.?\s+(?:the\s+)?$")
+
+
+def empty_spec():
+    return {
+        "players": [],
+        "teams": [],
+        "opponents": [],
+        "stats": [],
+        "min_line": None,
+        "max_line": None,
+        "all": False,
+    }
+
+
+def is_empty_spec(spec):
+    return not any(spec.get(key) for key in ("players", "teams", "opponents", "stats")) and \
+        spec.get("min_line") is None and spec.get("max_line") is None
+
+
+def stat_for(word, stat_keys):
+    """Map a word or abbreviation ("reb", "point") to a stat key on the slate, or None."""
+    if word in stat_keys:
+        return word
+    if f"{word}s" in stat_keys:
+        return f"{word}s"
+    alias = STAT_ALIASES.get(word)
+    if alias in stat_keys:
+        return alias
+    return None
+
+
+def _blank(text, start, end):
+    return text[:start] + " " * (end - start) + text[end:]
+
+
+def _lower(text):
+    # Keeps every offset: the few characters that lowercase to two are left as they are
+    return "".join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+
+
+def parse_filter_query(text, matcher, stat_keys, threshold=0.8):
+    """Build a filter spec from a search query without GPT.
+
+    ``stat_keys`` are the lowercased stat types on the slate. Returns None
+    when some part of the query couldn't be understood, so the caller can
+    fall back to asking GPT for the spec.
+    """
+    spec = empty_spec()
+    stat_keys = set(stat_keys)
+    # Team detection needs the original case ("vs MIN" but not "min"); both copies share offsets
+    original = str(text)
+    remaining = _lower(original)
+
+    # Line ranges first; "between 10 and 20" must not be split on "and"
+    for pattern, kind in _RANGE_PATTERNS:
+        for match in pattern.finditer(remaining):
+            if kind == "between":
+                low, high = sorted((float(match.group(1)), float(match.group(2))))
+                spec["min_line"], spec["max_line"] = low, high
+            elif kind == "min":
+                spec["min_line"] = float(match.group(1))
+            else:
+                spec["max_line"] = float(match.group(1))
+            remaining = _blank(remaining, match.start(), match.end())
+            original = _blank(original, match.start(), match.end())
+
+    # Teams, telling "lakers" apart from "vs the lakers"
+    for team_code, start, end in find_teams(original):
+        prefix = _OPPONENT_PREFIX.search(remaining[:start])
+        if prefix:
+            spec["opponents"].append(team_code)
+            remaining = _blank(remaining, prefix.start(), end)
+        else:
+            spec["teams"].append(team_code)
+            remaining = _blank(remaining, start, end)
+
+    # Multi-word stat types before single words
+    for stat in sorted(stat_keys, key=len, reverse=True):
+        if " " in stat:
+            for match in re.finditer(rf"\b{re.escape(stat)}\b", remaining):
+                spec["stats"].append(stat)
+                remaining = _blank(remaining, match.start(), match.end())
+
+    unresolved = False
+    saw_all = False
+    for part in _SPLIT_PATTERN.split(remaining):
+        words = []
+        for word in re.findall(r"[a-z0-9'.\-]+", part):
+            word = word.strip(".'-")
+            stat = stat_for(word, stat_keys)
+            if stat:
+                spec["stats"].append(stat)
+            elif word in ALL_WORDS:
+                saw_all = True
+            elif word and word not in FILLER_WORDS:
+                words.append(word)
+        if not words:
+            continue
+        name, score = matcher.best(" ".join(words))
+        if name and score >= threshold:
+            spec["players"].append(name)
+        else:
+            unresolved = True
+
+    if unresolved:
+        return None
+    for key in ("players", "teams", "opponents", "stats"):
+        spec[key] = list(dict.fromkeys(spec[key]))
+    if is_empty_spec(spec):
+        if not saw_all:
+            return None
+        spec["all"] = True
+    return spec
+
+
+def spec_from_json(data, matcher, stat_keys, threshold=0.8):
+    """Validate a GPT-produced spec, keeping only values that exist on the slate."""
+    spec = empty_spec()
+    if not isinstance(data, dict):
+        return spec
+    stat_keys = set(stat_keys)
+
+    for name in data.get("players") or []:
+        match, score = matcher.best(str(name))
+        if match and score >= threshold:
+            spec["players"].append(match)
+    for key in ("teams", "opponents"):
+        for team in data.get(key) or []:
+            team = str(team).strip()
+            code = team.upper() if team.upper() in TEAM_CODES else TEAM_ALIASES.get(team.lower())
+            if code:
+                spec[key].append(code)
+    for stat in data.get("stats") or []:
+        stat = stat_for(normalize_key(stat), stat_keys)
+        if stat:
+            spec["stats"].append(stat)
+    for key in ("min_line", "max_line"):
+        try:
+            spec[key] = float(data[key]) if data.get(key) is not None else None
+        except (TypeError, ValueError):
+            spec[key] = None
+    spec["all"] = bool(data.get("all"))
+
+    for key in ("players", "teams", "opponents", "stats"):
+        spec[key] = list(dict.fromkeys(spec[key]))
+    return spec
+
+
+def apply_filter(spec, df, line_index, rosters=None):
+    """Run a filter spec against the indexed table and return matching rows.
+
+    ``rosters`` maps each team code in the spec to its players on the slate.
+    An empty spec only matches everything when it was asked for (``all``).
+    """
+    rosters = rosters or {}
+    if is_empty_spec(spec) and not spec.get("all"):
+        return df.iloc[[]]
+
+    selected = None
+    if spec["players"] or spec["teams"]:
+        selected = set()
+        for player in spec["players"]:
+            selected.update(line_index.player(player))
+        for team in spec["teams"]:
+            for player in rosters.get(team) or []:
+                selected.update(line_index.player(player))
+
+    def narrow(current, positions):
+        positions = set(positions)
+        return positions if current is None else current & positions
+
+    if spec["opponents"]:
+        selected = narrow(selected, (pos for team in spec["opponents"] for pos in line_index.opponent(team)))
+    if spec["stats"]:
+        selected = narrow(selected, (pos for stat in spec["stats"] for pos in line_index.stat(stat)))
+
+    positions = np.array(sorted(selected) if selected is not None else range(len(df)), dtype=int)
+    if spec.get("min_line") is not None or spec.get("max_line") is not None:
+        line_values = df["line_value"].to_numpy(dtype=float)[positions]
+        keep = np.ones(len(positions), dtype=bool)
+        if spec.get("min_line") is not None:
+            keep &= line_values >= spec["min_line"]
+        if spec.get("max_line") is not None:
+            keep &= line_values <= spec["max_line"]
+        positions = positions[keep]
+    return df.iloc[positions]
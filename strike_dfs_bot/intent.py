@@ -0,0 +1,46 @@
+"""Rule-based search-vs-bet classification for search-mode messages."""
+import re
+
+from filters import parse_filter_query
+
+SEARCH = "search"
+BET = "bet"
+
+# Words that only show up when someone is placing a bet
+BET_WORDS = re.compile(r"\b(?:bet|bets|betting|wager|parlay|place|add|stake|entry|put)\b")
+MONEY = re.compile(r"\$\s*\d|\b\d+(?:\.\d+)?\s*(?:dollars|bucks|usd)\b")
+OVER_UNDER = re.compile(r"\b(?:over|under)\b")
+
+# Words that only show up when someone is browsing lines
+SEARCH_WORDS = re.compile(
+    r"\b(?:show|list|find|search|see|view|display|lines|props|available|what are|whats|which|all)\b"
+)
+
+
+def classify_intent(text, matcher, stat_keys, threshold=0.8):
+    """Return ``SEARCH``, ``BET`` or None when the text is genuinely ambiguous.
+
+    Relies on the local player/team/stat vocabularies (via
+    ``parse_filter_query``) plus betting keywords, so the common cases never
+    need a network call.
+    """
+    text = " ".join(str(text).split())
+    if not text:
+        return None
+    # The filter parser gets the original case: "vs MIN" is a team, "min" is not
+    spec = parse_filter_query(text, matcher, stat_keys, threshold=threshold)
+    text = text.lower()
+
+    if MONEY.search(text):
+        return BET
+    if BET_WORDS.search(text) and not SEARCH_WORDS.search(text):
+        return BET
+
+    if spec is None:
+        # Words we don't know; let GPT decide
+        return None
+    # "curry points over 25" reads as a line search and as a pick; only GPT can tell
+    if OVER_UNDER.search(text) and (spec["players"] or spec["teams"]) and not SEARCH_WORDS.search(text):
+        return None
+    # Only known players/teams/stats and range filters ("curry", "show lakers rebounds over 8")
+    return SEARCH
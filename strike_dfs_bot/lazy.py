@@ -0,0 +1,24 @@
+"""Deferred imports for heavy dependencies."""
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    """Return module ``name`` without executing it until an attribute is first used.
+
+    Lets the bot connect to Discord before pandas/numpy/openai have loaded;
+    ``bot.load_data`` touches them from a worker thread before any handler
+    that needs them is allowed to run.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named {name!r}")
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,735 @@
+"""Betting-line loading and lookups shared by the Discord bot."""
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import pickle
+import shutil
+from bisect import bisect_left, insort
+from functools import lru_cache
+
+from lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Low-cardinality text columns stored as pandas categoricals
+CATEGORICAL_COLUMNS = ["player_name", "stat_type", "opponent", "status", "league"]
+
+# Lowercased lookup columns derived from the display columns
+KEY_COLUMNS = {
+    "player_key": "player_name",
+    "stat_key": "stat_type",
+    "opponent_key": "opponent",
+}
+
+DATETIME_COLUMNS = ["start_time", "end_time", "updated_at"]
+
+
+def normalize_key(value):
+    """Lowercase/strip a player, stat or team name for index lookups."""
+    if value is None:
+        return ""
+    return str(value).strip().lower()
+
+
+def line_key(value):
+    """Normalize a line value so 25, "25" and 25.0 hit the same index entry."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_lines(df):
+    """Convert a raw lines frame to the compact representation the bot works with.
+
+    Text columns become categoricals, lowercase key columns are precomputed so
+    filters never call ``.str.lower()`` per message, and timestamps are parsed
+    once.
+    """
+    df = df.reset_index(drop=True)
+    for key_column, source_column in KEY_COLUMNS.items():
+        if source_column in df.columns:
+            df[key_column] = df[source_column].astype(str).str.strip().str.lower().astype("category")
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype("category")
+    for column in DATETIME_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], utc=True, format="ISO8601", errors="coerce")
+    return df
+
+
+def load_lines(csv_path):
+    """Read the betting-lines CSV into a normalized DataFrame."""
+    return normalize_lines(pd.read_csv(csv_path))
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """sha256 of a file's bytes; identifies the CSV a snapshot was built from."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def snapshot_dir(csv_path):
+    """Where binary snapshots of ``csv_path`` live (one subdirectory per CSV hash and code version)."""
+    return f"{csv_path}.snapshot"
+
+
+# Bump when the snapshot layout itself changes
+SNAPSHOT_FORMAT = 1
+
+
+@lru_cache(maxsize=1)
+def _code_hash():
+    with open(__file__, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def snapshot_version():
+    """Snapshot format plus a hash of this module's code.
+
+    The snapshot holds the output of ``normalize_lines`` and a pickled
+    ``LineIndex``, so one written by different code must not be reused.
+    """
+    return f"{SNAPSHOT_FORMAT}-{_code_hash()}"
+
+
+def _snapshot_target(directory, source_hash):
+    return os.path.join(directory, f"{source_hash}-{snapshot_version()}")
+
+
+def save_snapshot(df, index, directory, source_hash):
+    """Write ``df`` as one ``.npy`` array per column plus the pickled index.
+
+    Text columns are stored as integer codes plus their distinct values so
+    every array can be memory-mapped. The snapshot is written to a temporary
+    directory and renamed into place, and older snapshots are removed.
+    """
+    target = _snapshot_target(directory, source_hash)
+    if os.path.exists(os.path.join(target, "meta.json")):
+        return target
+    tmp_dir = f"{target}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    columns = []
+    for position, column in enumerate(df.columns):
+        series = df[column]
+        entry = {"name": column, "file": f"{position}.npy"}
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            entry["kind"] = "category"
+            entry["values"] = series.cat.categories.tolist()
+            data = series.cat.codes.to_numpy()
+        elif isinstance(series.dtype, pd.DatetimeTZDtype) or pd.api.types.is_datetime64_dtype(series.dtype):
+            entry["kind"] = "datetime"
+            entry["unit"] = series.dt.unit
+            entry["tz"] = str(series.dt.tz) if series.dt.tz is not None else None
+            data = series.dt.tz_localize(None).to_numpy().view("int64") if series.dt.tz is not None else \
+                series.to_numpy().view("int64")
+        elif pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+            entry["kind"] = "numeric"
+            data = series.to_numpy()
+        else:
+            codes, uniques = pd.factorize(series)
+            entry["kind"] = "text"
+            entry["values"] = [str(value) for value in uniques]
+            data = codes.astype("int32")
+        np.save(os.path.join(tmp_dir, entry["file"]), data, allow_pickle=False)
+        columns.append(entry)
+
+    with open(os.path.join(tmp_dir, "index.pickle"), "wb") as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+        json.dump({
+            "source_hash": source_hash,
+            "version": snapshot_version(),
+            "rows": len(df),
+            "columns": columns,
+        }, f)
+
+    try:
+        os.replace(tmp_dir, target)
+    except OSError:
+        # Another process got there first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    for name in os.listdir(directory):
+        if name != os.path.basename(target) and ".tmp-" not in name:
+            shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+    return target
+
+
+def load_snapshot(directory, source_hash):
+    """Return ``(df, index)`` from the snapshot for ``source_hash``, or None if there isn't a valid one.
+
+    Only snapshots written by this version of the code count as valid.
+    """
+    target = _snapshot_target(directory, source_hash)
+    if not os.path.exists(os.path.join(target, "meta.json")):
+        return None
+    try:
+        with open(os.path.join(target, "meta.json"), "r") as f:
+            meta = json.load(f)
+        if meta.get("source_hash") != source_hash or meta.get("version") != snapshot_version():
+            # Built from another file, or by other code
+            return None
+
+        data = {}
+        for entry in meta["columns"]:
+            values = np.load(os.path.join(target, entry["file"]), mmap_mode="r", allow_pickle=False)
+            if entry["kind"] == "category":
+                data[entry["name"]] = pd.Categorical.from_codes(values, entry["values"])
+            elif entry["kind"] == "datetime":
+                column = pd.Series(np.asarray(values).view(f"datetime64[{entry['unit']}]"))
+                data[entry["name"]] = column.dt.tz_localize(entry["tz"]) if entry["tz"] else column
+            elif entry["kind"] == "text":
+                # Code -1 (missing) picks the trailing None
+                data[entry["name"]] = np.array(entry["values"] + [None], dtype=object)[values]
+            else:
+                data[entry["name"]] = values
+        df = pd.DataFrame(data)
+
+        with open(os.path.join(target, "index.pickle"), "rb") as f:
+            index = pickle.load(f)
+    except (OSError, ValueError, KeyError, pickle.UnpicklingError, EOFError) as e:
+        print(f"Warning: Could not load lines snapshot {target}: {e}")
+        return None
+    if len(df) != meta["rows"]:
+        return None
+    return df, index
+
+
+def load_lines_cached(csv_path, directory=None):
+    """Load the lines table and its ``LineIndex``, using the binary snapshot when it matches the CSV.
+
+    Falls back to parsing the CSV (and writes a fresh snapshot) when the
+    snapshot is missing or was built from a different file.
+    """
+    directory = directory or snapshot_dir(csv_path)
+    source_hash = file_hash(csv_path)
+    cached = load_snapshot(directory, source_hash)
+    if cached is not None:
+        return cached
+
+    df = load_lines(csv_path)
+    index = LineIndex(df)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        save_snapshot(df, index, directory, source_hash)
+    except OSError as e:
+        print(f"Warning: Could not save lines snapshot: {e}")
+    return df, index
+
+
+def _key_column(df, column, values):
+    if column in df.columns:
+        return df[column].tolist()
+    return [normalize_key(value) for value in values]
+
+
+# LineIndex attributes mapping a key to row positions, in _index_keys order
+POSITIONAL_INDEXES = ("by_player", "by_stat", "by_player_stat", "by_player_stat_line", "by_opponent")
+
+
+def _index_keys(df, positions):
+    """LineIndex keys of the rows at ``positions``: one tuple per row, in ``POSITIONAL_INDEXES`` order."""
+    rows = df.iloc[list(positions)]
+    players = _key_column(rows, "player_key", rows["player_name"].tolist())
+    stats = _key_column(rows, "stat_key", rows["stat_type"].tolist())
+    opponents = _key_column(rows, "opponent_key", rows["opponent"].tolist())
+    return [
+        (player, stat, (player, stat), (player, stat, line_key(line)), opponent)
+        for player, stat, line, opponent in zip(players, stats, rows["line_value"].tolist(), opponents)
+    ]
+
+
+class LineIndex:
+    """Row positions into the lines DataFrame keyed by player, stat, line and opponent.
+
+    Built once per loaded table so message handlers can do dictionary lookups
+    instead of scanning the whole frame with boolean masks. Every lookup
+    returns positions in table order, ready for ``df.iloc``.
+    """
+
+    def __init__(self, df):
+        self.by_player = {}
+        self.by_stat = {}
+        self.by_player_stat = {}
+        self.by_player_stat_line = {}
+        self.by_opponent = {}
+        self.player_names = {}
+        self.stat_names = {}
+        self.stats_by_player = {}
+        self.event_ids = df["event_id"].tolist() if "event_id" in df.columns else []
+
+        players = df["player_name"].tolist()
+        stats = df["stat_type"].tolist()
+        line_values = df["line_value"].tolist()
+        opponents = df["opponent"].tolist()
+        # Reuse the precomputed key columns from normalize_lines when available
+        player_keys = _key_column(df, "player_key", players)
+        stat_keys = _key_column(df, "stat_key", stats)
+        opponent_keys = _key_column(df, "opponent_key", opponents)
+
+        columns = zip(players, stats, line_values, player_keys, stat_keys, opponent_keys)
+        for pos, (player, stat, line, player_key, stat_key, opponent_key) in enumerate(columns):
+            self.player_names.setdefault(player_key, player)
+            self.stat_names.setdefault(stat_key, stat)
+
+            self.by_player.setdefault(player_key, []).append(pos)
+            self.by_stat.setdefault(stat_key, []).append(pos)
+            if (player_key, stat_key) not in self.by_player_stat:
+                self.stats_by_player.setdefault(player_key, []).append(stat)
+            self.by_player_stat.setdefault((player_key, stat_key), []).append(pos)
+            self.by_player_stat_line.setdefault((player_key, stat_key, line_key(line)), []).append(pos)
+            self.by_opponent.setdefault(opponent_key, []).append(pos)
+
+        self._set_players_version()
+
+        # Per (player, stat) line values, de-duplicated in table order
+        self.lines_by_player_stat = {
+            key: list(dict.fromkeys(line_values[pos] for pos in positions))
+            for key, positions in self.by_player_stat.items()
+        }
+
+    def _set_players_version(self):
+        # Changes whenever the set of players changes; used to key cached name resolutions
+        self.players_version = hashlib.sha1(
+            "\n".join(sorted(self.player_names.values())).encode("utf-8")
+        ).hexdigest()[:12]
+
+    def patched(self, old_df, new_df, updated=(), removed=()):
+        """Index for ``new_df``, derived from this one (built for ``old_df``) by re-keying only changed rows.
+
+        ``updated`` and ``removed`` are positions in ``old_df`` of rows whose
+        values changed and of rows that are gone; rows of ``new_df`` after the
+        surviving ones are new. Key lists nothing touched are shared with this
+        index, which is left as it was. Positions after the first removed row
+        shift down, so removals re-number those lists.
+        """
+        new = copy.copy(self)
+        for name in POSITIONAL_INDEXES + ("player_names", "stat_names", "stats_by_player", "lines_by_player_stat"):
+            setattr(new, name, dict(getattr(self, name)))
+        new.event_ids = new_df["event_id"].tolist() if "event_id" in new_df.columns else []
+
+        owned = set()
+        touched = set()
+
+        def writable(name, key):
+            mapping = getattr(new, name)
+            if (name, key) not in owned:
+                mapping[key] = list(mapping.get(key, ()))
+                owned.add((name, key))
+            touched.add((name, key))
+            return mapping[key]
+
+        # Take changed and removed rows out under their old keys
+        old_rows = sorted(set(updated) | set(removed))
+        for pos, keys in zip(old_rows, _index_keys(old_df, old_rows)):
+            for name, key in zip(POSITIONAL_INDEXES, keys):
+                writable(name, key).remove(pos)
+
+        removed = sorted(removed)
+        if removed:
+            for name in POSITIONAL_INDEXES:
+                mapping = getattr(new, name)
+                for key, positions in mapping.items():
+                    if positions and positions[-1] > removed[0]:
+                        mapping[key] = [pos - bisect_left(removed, pos) for pos in positions]
+                        owned.add((name, key))
+
+        # Put changed rows back under their new keys, then add the new rows
+        added = [pos - bisect_left(removed, pos) for pos in sorted(updated)]
+        added += range(len(old_df) - len(removed), len(new_df))
+        for pos, keys in zip(added, _index_keys(new_df, added)):
+            for name, key in zip(POSITIONAL_INDEXES, keys):
+                insort(writable(name, key), pos)
+
+        for name, key in touched:
+            mapping = getattr(new, name)
+            if not mapping.get(key, True):
+                del mapping[key]
+
+        players = new_df["player_name"]
+        stats = new_df["stat_type"]
+        line_values = new_df["line_value"]
+        for name, key in touched:
+            if name == "by_player":
+                positions = new.by_player.get(key)
+                if not positions:
+                    new.player_names.pop(key, None)
+                    new.stats_by_player.pop(key, None)
+                    continue
+                new.player_names[key] = players.iat[positions[0]]
+                stats_seen = {}
+                for pos, keys in zip(positions, _index_keys(new_df, positions)):
+                    stats_seen.setdefault(keys[1], stats.iat[pos])
+                new.stats_by_player[key] = list(stats_seen.values())
+            elif name == "by_stat":
+                positions = new.by_stat.get(key)
+                if positions:
+                    new.stat_names[key] = stats.iat[positions[0]]
+                else:
+                    new.stat_names.pop(key, None)
+            elif name == "by_player_stat":
+                positions = new.by_player_stat.get(key)
+                if positions:
+                    new.lines_by_player_stat[key] = list(dict.fromkeys(line_values.iat[pos] for pos in positions))
+                else:
+                    new.lines_by_player_stat.pop(key, None)
+        new._set_players_version()
+        return new
+
+    def player(self, name):
+        return self.by_player.get(normalize_key(name), [])
+
+    def stat(self, stat):
+        return self.by_stat.get(normalize_key(stat), [])
+
+    def player_stat(self, name, stat):
+        return self.by_player_stat.get((normalize_key(name), normalize_key(stat)), [])
+
+    def player_stat_line(self, name, stat, line):
+        return self.by_player_stat_line.get((normalize_key(name), normalize_key(stat), line_key(line)), [])
+
+    def opponent(self, team):
+        return self.by_opponent.get(normalize_key(team), [])
+
+    def event_id(self, name, stat, line):
+        """Return the first event_id for an exact player/stat/line, or None."""
+        positions = self.player_stat_line(name, stat, line)
+        if not positions or not self.event_ids:
+            return None
+        return self.event_ids[positions[0]]
+
+    def has_line(self, name, stat, line):
+        return bool(self.player_stat_line(name, stat, line))
+
+    def canonical_player(self, name):
+        """Return the player's name as stored in the table, or None if unknown."""
+        return self.player_names.get(normalize_key(name))
+
+    def stats_for(self, name):
+        """Stat types offered for a player, in table order."""
+        return self.stats_by_player.get(normalize_key(name), [])
+
+    def lines_for(self, name, stat):
+        """Distinct line values for a player/stat pair, in table order."""
+        return self.lines_by_player_stat.get((normalize_key(name), normalize_key(stat)), [])
+
+    def players(self):
+        return list(self.player_names.values())
+
+    def stats(self):
+        return list(self.stat_names.values())
+
+
+# Statuses (or delta ops) that take a line off the board
+CLOSED_STATUSES = {"SUSPENDED", "CLOSED", "SETTLED", "CANCELLED", "CANCELED", "VOID"}
+DELETE_OPS = {"delete", "remove", "close", "suspend"}
+
+
+def read_deltas(path):
+    """Read a delta file: a CSV, or JSON lines with one event change per line.
+
+    Each change needs ``event_id`` and ``updated_at``; any other column is
+    optional for updates (missing values are left unchanged). An ``op`` of
+    delete/remove/close/suspend, or a closed ``status``, takes the line off
+    the board.
+    """
+    if path.endswith((".jsonl", ".ndjson")):
+        deltas = pd.read_json(path, lines=True, dtype=False)
+    else:
+        deltas = pd.read_csv(path)
+    return deltas
+
+
+def _set_cells(table, column, positions, values):
+    """Assign ``values`` to ``table[column]`` at row ``positions``, keeping the column's dtype."""
+    series = table[column]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        new_categories = pd.Index(values).unique().difference(series.cat.categories)
+        if len(new_categories):
+            table[column] = series.cat.add_categories(new_categories)
+    elif column in DATETIME_COLUMNS:
+        values = pd.to_datetime(pd.Series(values), utc=True, format="ISO8601", errors="coerce").tolist()
+    table.iloc[positions, table.columns.get_loc(column)] = values
+
+
+def _append_rows(table, rows):
+    """``table`` with normalized ``rows`` appended; categoricals gain any new categories."""
+    rows = normalize_lines(pd.DataFrame(rows)).reindex(columns=table.columns)
+    for column in table.columns:
+        series = table[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            values = rows[column].astype(object)
+            new_categories = pd.Index(values.dropna()).unique().difference(series.cat.categories)
+            if len(new_categories):
+                table[column] = series = series.cat.add_categories(new_categories)
+            rows[column] = pd.Categorical(values, categories=series.cat.categories)
+        elif column in DATETIME_COLUMNS:
+            rows[column] = pd.to_datetime(rows[column], utc=True, format="ISO8601", errors="coerce")
+    return pd.concat([table, rows], ignore_index=True)
+
+
+def apply_deltas(df, deltas, tombstones=None, index=None):
+    """Return ``(new_df, new_index, counts)`` with insert/update/close changes applied to ``df``.
+
+    Changes older than (or as old as) what the table already has for that
+    event are dropped, as are changes without a usable ``updated_at``.
+    ``tombstones`` (event_id -> updated_at of closed events) is updated in
+    place so a late update can't resurrect a line. Only the changed cells
+    are written (categoricals keep their codes) and ``index``, the
+    ``LineIndex`` of ``df``, is patched rather than rebuilt (``new_index`` is
+    None without it). The inputs are never modified; callers swap in the result.
+    """
+    counts = {"inserted": 0, "updated": 0, "closed": 0, "stale": 0}
+    tombstones = {} if tombstones is None else tombstones
+    if deltas.empty:
+        return df, index, counts
+
+    deltas = deltas.copy()
+    deltas["updated_at"] = pd.to_datetime(deltas["updated_at"], utc=True, format="ISO8601", errors="coerce")
+    # Unordered changes would sort last and hide a valid change for the same event
+    undated = deltas["updated_at"].isna()
+    counts["stale"] += int(undated.sum())
+    # Only the newest change per event matters
+    deltas = deltas[~undated].sort_values("updated_at", kind="stable").drop_duplicates("event_id", keep="last")
+
+    positions = dict(zip(df["event_id"].tolist(), range(len(df))))
+    current_updated = df["updated_at"]
+    columns = [column for column in df.columns if column not in KEY_COLUMNS]
+
+    closed, updates, inserts = [], [], []
+    for change in deltas.to_dict(orient="records"):
+        event_id = change["event_id"]
+        updated_at = change["updated_at"]
+        pos = positions.get(event_id)
+        known = current_updated.iat[pos] if pos is not None else tombstones.get(event_id)
+        if known is not None and not pd.isna(known) and updated_at <= known:
+            counts["stale"] += 1
+            continue
+
+        op = str(change.get("op") or "").strip().lower()
+        status = str(change.get("status") or "").strip().upper()
+        if op in DELETE_OPS or status in CLOSED_STATUSES:
+            tombstones[event_id] = updated_at
+            if pos is not None:
+                closed.append(pos)
+                counts["closed"] += 1
+            continue
+
+        tombstones.pop(event_id, None)
+        change = {column: change[column] for column in columns if column in change}
+        if pos is not None:
+            updates.append((pos, change))
+        else:
+            inserts.append(change)
+
+    if not (updates or closed or inserts):
+        return df, index, counts
+
+    # Shallow copy: with pandas copy-on-write only the columns written below are copied
+    table = df.copy(deep=False)
+    changed_columns = set()
+    if updates:
+        cells = {}
+        for pos, change in updates:
+            for column, value in change.items():
+                # Missing values in a change leave the cell as it was
+                if not pd.isna(value):
+                    cells.setdefault(column, ([], []))
+                    cells[column][0].append(pos)
+                    cells[column][1].append(value)
+        for key_column, source_column in KEY_COLUMNS.items():
+            if source_column in cells and key_column in table.columns:
+                cell_positions, values = cells[source_column]
+                cells[key_column] = (cell_positions, [normalize_key(value) for value in values])
+        for column, (cell_positions, values) in cells.items():
+            _set_cells(table, column, cell_positions, values)
+        changed_columns.update(cells)
+        counts["updated"] = len(updates)
+    if closed:
+        table = table.drop(index=closed).reset_index(drop=True)
+        changed_columns.update(table.columns)
+    if inserts:
+        table = _append_rows(table, inserts)
+        counts["inserted"] = len(inserts)
+    for column in changed_columns:
+        if isinstance(table[column].dtype, pd.CategoricalDtype):
+            table[column] = table[column].cat.remove_unused_categories()
+
+    new_index = None
+    if index is not None:
+        new_index = index.patched(df, table, [pos for pos, _ in updates], closed)
+    return table, new_index, counts
+
+
+def file_signature(path):
+    """(mtime, size) of ``path``, or None if it's missing; changes whenever the file is rewritten."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class LinesReloader:
+    """Polls the lines CSV and installs a rebuilt snapshot when it changes.
+
+    ``build(path)`` runs in a worker thread and returns a complete snapshot
+    (table plus everything derived from it); ``install(snapshot)`` then runs
+    on the event loop, so handlers switch from the old snapshot to the new
+    one in a single step and never see a half-built table.
+    """
+
+    def __init__(self, path, build, install, interval=60.0):
+        self.path = path
+        self.build = build
+        self.install = install
+        self.interval = interval
+        self.signature = file_signature(path)
+        self.reloads = 0
+        self._task = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return self._task
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception as e:
+                # Keep serving the current snapshot; try again next interval
+                print(f"Warning: Could not reload lines from {self.path}: {e}")
+
+    async def check(self):
+        """Reload if the file changed since the last load; returns True if a new snapshot was installed."""
+        signature = file_signature(self.path)
+        if signature is None or signature == self.signature:
+            return False
+        snapshot = await asyncio.get_running_loop().run_in_executor(None, self.build, self.path)
+        if file_signature(self.path) != signature:
+            # Still being written; pick it up once it settles
+            return False
+        self.install(snapshot)
+        self.signature = signature
+        self.reloads += 1
+        print(f"🔄 Reloaded lines from {self.path}")
+        return True
+
+
+class DeltaIngestor:
+    """Applies delta files dropped into a directory to the live lines snapshot.
+
+    New ``*.csv`` / ``*.jsonl`` files are applied in name order with
+    ``apply_deltas`` in a worker thread. ``current()`` returns the installed
+    snapshot, whose first two items are the table and its ``LineIndex``; the
+    patched pair goes through ``build(df, index, previous)`` and is installed
+    like a full reload, and the files are moved to ``processed/`` (or
+    ``failed/``). ``ingest`` accepts changes from any other stream the same way.
+    """
+
+    DELTA_EXTENSIONS = (".csv", ".jsonl", ".ndjson")
+
+    def __init__(self, directory, current, build, install, interval=5.0):
+        self.directory = directory
+        self.current = current
+        self.build = build
+        self.install = install
+        self.interval = interval
+        self.tombstones = {}
+        self.totals = {"inserted": 0, "updated": 0, "closed": 0, "stale": 0}
+        self._lock = asyncio.Lock()
+        self._task = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return self._task
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception as e:
+                print(f"Warning: Could not ingest line deltas: {e}")
+
+    def pending_files(self):
+        try:
+            names = sorted(os.listdir(self.directory))
+        except OSError:
+            return []
+        return [
+            os.path.join(self.directory, name)
+            for name in names
+            if name.endswith(self.DELTA_EXTENSIONS) and os.path.isfile(os.path.join(self.directory, name))
+        ]
+
+    async def check(self):
+        """Apply every pending delta file; returns the number of files handled."""
+        paths = self.pending_files()
+        if not paths:
+            return 0
+        batches = []
+        for path in paths:
+            try:
+                batches.append(read_deltas(path))
+            except Exception as e:
+                print(f"Warning: Could not read line deltas {path}: {e}")
+                self._archive(path, "failed")
+                return 0
+        if await self.ingest(pd.concat(batches, ignore_index=True)):
+            for path in paths:
+                self._archive(path, "processed")
+            return len(paths)
+        return 0
+
+    async def ingest(self, deltas):
+        """Apply a frame of changes; returns False if a full reload raced with it (retry later)."""
+        async with self._lock:
+            base = self.current()
+            base_df, base_index = base[0], base[1]
+            tombstones = dict(self.tombstones)
+
+            def patch():
+                new_df, new_index, counts = apply_deltas(base_df, deltas, tombstones, base_index)
+                if new_df is base_df:
+                    return None, counts
+                return self.build(new_df, new_index, base), counts
+
+            snapshot, counts = await asyncio.get_running_loop().run_in_executor(None, patch)
+            if self.current()[0] is not base_df:
+                # A full reload replaced the table while we were patching the old one
+                return False
+            if snapshot is not None:
+                self.install(snapshot)
+            self.tombstones = tombstones
+            for key, value in counts.items():
+                self.totals[key] += value
+            return True
+
+    def _archive(self, path, folder):
+        target = os.path.join(self.directory, folder)
+        try:
+            os.makedirs(target, exist_ok=True)
+            os.replace(path, os.path.join(target, os.path.basename(path)))
+        except OSError as e:
+            print(f"Warning: Could not move {path} to {folder}/: {e}")
@@ -0,0 +1,267 @@
+"""Async OpenAI access for the Discord bot."""
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from lazy import lazy_import
+
+openai = lazy_import("openai")
+
+
+@lru_cache(maxsize=None)
+def retryable_errors():
+    """Errors worth another attempt; anything else (bad request, auth) fails fast."""
+    return (
+        asyncio.TimeoutError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.RateLimitError,
+        openai.InternalServerError,
+    )
+
+
+def normalize_query(text):
+    """Lowercase and collapse whitespace so trivially different inputs share a cache entry."""
+    return " ".join(str(text).lower().split())
+
+
+class TTLCache:
+    """LRU cache of completion replies with a time-to-live.
+
+    Optionally persisted to a JSON file (``path``) so warm answers survive a
+    restart. Expiry uses wall-clock time for the same reason.
+    """
+
+    def __init__(self, max_entries=4096, ttl=6 * 3600, path=None, flush_every=20):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.flush_every = flush_every
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._dirty = 0
+        self._lock = threading.Lock()
+        if path:
+            self.load()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.time() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty += 1
+            should_flush = self.path and self._dirty >= self.flush_every
+        if should_flush:
+            self.flush()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._dirty += 1
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not load LLM cache: {e}")
+            return
+        now = time.time()
+        with self._lock:
+            for key, value, expires_at in data:
+                if expires_at > now:
+                    self._entries[key] = (value, expires_at)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def flush(self):
+        """Write unexpired entries to ``path`` (atomically) if anything changed."""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            now = time.time()
+            data = [[key, value, expires_at] for key, (value, expires_at) in self._entries.items() if expires_at > now]
+            self._dirty = 0
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Warning: Could not save LLM cache: {e}")
+
+
+class LLMGateway:
+    """Single entry point for chat completions.
+
+    Limits how many completions run at once, bounds each attempt with a
+    timeout, retries transient failures with jittered exponential backoff and
+    lets callers cancel everything a given user (``owner``) has in flight, so
+    one slow completion never blocks the event loop or other users. Calls
+    made with a ``cache_key`` are answered from ``cache`` when possible, and
+    identical calls already in flight share one request (single-flight).
+    """
+
+    def __init__(self, api_key, model="gpt-4o", max_concurrency=8, timeout=20.0,
+                 max_retries=3, backoff=0.5, max_backoff=8.0, cache=None):
+        self.api_key = api_key
+        self._client = None
+        self.model = model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self._slots = None
+        self._inflight = {}
+        self._flights = {}
+        self.coalesced = 0
+
+    @property
+    def client(self):
+        """The OpenAI client, created on first use so importing this module stays cheap."""
+        if self._client is None:
+            # Retries are handled here so they share the concurrency limit and deadline
+            self._client = openai.AsyncOpenAI(api_key=self.api_key, max_retries=0)
+        return self._client
+
+    async def complete(self, messages, temperature=0, model=None, timeout=None, deadline=None, owner=None,
+                       cache_key=None):
+        """Return the stripped text of a chat completion.
+
+        ``timeout`` bounds each attempt, ``deadline`` (event-loop time) bounds
+        the whole call including retries, and ``owner`` groups the call so
+        ``cancel(owner)`` can abort it. Replies are cached under ``cache_key``;
+        failed calls are never cached.
+        """
+        if cache_key is not None and self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        async def fetch():
+            reply = await self._complete(messages, temperature, model, timeout, deadline)
+            if cache_key is not None and self.cache is not None:
+                self.cache.put(cache_key, reply)
+            return reply
+
+        flight_key = cache_key if cache_key is not None else self.request_key(messages, temperature, model)
+        return await self._run(owner, self._single_flight(flight_key, fetch))
+
+    def request_key(self, messages, temperature=0, model=None):
+        """Identity of a completion request, for coalescing identical calls."""
+        payload = json.dumps([model or self.model, temperature, messages], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def _single_flight(self, key, fetch):
+        """Join the in-flight request for ``key`` or start it.
+
+        Each caller waits on a shield, so cancelling one caller (e.g. via
+        ``cancel(owner)``) doesn't cancel the request for the others; the
+        request itself is cancelled once nobody is waiting on it.
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = {"task": asyncio.ensure_future(fetch()), "waiters": 0}
+            self._flights[key] = flight
+            flight["task"].add_done_callback(lambda _task: self._end_flight(key, flight))
+        else:
+            self.coalesced += 1
+
+        flight["waiters"] += 1
+        try:
+            return await asyncio.shield(flight["task"])
+        finally:
+            flight["waiters"] -= 1
+            if flight["waiters"] == 0 and not flight["task"].done():
+                # Forget it now: a caller arriving before the task finishes
+                # cancelling must start a fresh request, not join this one
+                self._end_flight(key, flight)
+                flight["task"].cancel()
+
+    def _end_flight(self, key, flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    async def _run(self, owner, coro):
+        task = asyncio.ensure_future(coro)
+        if owner is None:
+            return await task
+
+        self._inflight.setdefault(owner, set()).add(task)
+        try:
+            return await task
+        finally:
+            tasks = self._inflight.get(owner)
+            if tasks is not None:
+                tasks.discard(task)
+                if not tasks:
+                    del self._inflight[owner]
+
+    async def ask(self, prompt, **kwargs):
+        """Shortcut for a single user-message completion."""
+        return await self.complete([{"role": "user", "content": prompt}], **kwargs)
+
+    def cancel(self, owner):
+        """Cancel every completion currently running on behalf of ``owner``."""
+        for task in list(self._inflight.get(owner, ())):
+            task.cancel()
+
+    async def _complete(self, messages, temperature, model, timeout, deadline):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        loop = asyncio.get_running_loop()
+        timeout = timeout or self.timeout
+
+        attempt = 0
+        while True:
+            attempt_timeout = timeout
+            if deadline is not None:
+                attempt_timeout = min(timeout, deadline - loop.time())
+                if attempt_timeout <= 0:
+                    raise asyncio.TimeoutError("LLM deadline exceeded")
+            try:
+                async with self._slots:
+                    response = await asyncio.wait_for(
+                        self.client.chat.completions.create(
+                            model=model or self.model,
+                            messages=messages,
+                            temperature=temperature,
+                        ),
+                        timeout=attempt_timeout,
+                    )
+                return response.choices[0].message.content.strip()
+            except retryable_errors():
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                # Full jitter keeps a burst of failed calls from retrying in lockstep
+                delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+                if deadline is not None and loop.time() + delay >= deadline:
+                    raise
+                await asyncio.sleep(delay)
@@ -0,0 +1,11 @@
+"""Start the Discord bot: ``python main.py``.
+
+Render workers are spawned processes that re-import the ``__main__`` module,
+so the entry point stays tiny and bot.py's state (session store, caches,
+Discord client) is only built in the bot process itself.
+"""
+
+if __name__ == "__main__":
+    import bot
+
+    bot.main()
@@ -0,0 +1,267 @@
+"""Local player-name matching so common lookups never need GPT."""
+import json
+import os
+import re
+import unicodedata
+
+# Nicknames and shorthand people actually type; targets not on the slate are ignored
+DEFAULT_ALIASES = {
+    "bron": "LeBron James",
+    "lebron": "LeBron James",
+    "king james": "LeBron James",
+    "lbj": "LeBron James",
+    "steph": "Stephen Curry",
+    "chef curry": "Stephen Curry",
+    "ant": "Anthony Edwards",
+    "ant man": "Anthony Edwards",
+    "sga": "Shai Gilgeous-Alexander",
+    "shai": "Shai Gilgeous-Alexander",
+    "ad": "Anthony Davis",
+    "the brow": "Anthony Davis",
+    "kd": "Kevin Durant",
+    "greek freak": "Giannis Antetokounmpo",
+    "giannis": "Giannis Antetokounmpo",
+    "joker": "Nikola Jokic",
+    "jokic": "Nikola Jokic",
+    "luka": "Luka Doncic",
+    "dame": "Damian Lillard",
+    "cp3": "Chris Paul",
+    "pg": "Paul George",
+    "pg13": "Paul George",
+    "jimmy buckets": "Jimmy Butler",
+    "the beard": "James Harden",
+    "wemby": "Victor Wembanyama",
+    "spida": "Donovan Mitchell",
+    "ja": "Ja Morant",
+    "trae": "Trae Young",
+    "jt": "Jayson Tatum",
+    "jb": "Jaylen Brown",
+    "book": "Devin Booker",
+    "zion": "Zion Williamson",
+    "draymond": "Draymond Green",
+    "klay": "Klay Thompson",
+    "embiid": "Joel Embiid",
+}
+
+# Name suffixes that shouldn't count as a last name
+SUFFIXES = {"jr", "sr", "ii", "iii", "iv"}
+
+# Taken off a name matched only through a token other players share ("Green")
+SHARED_TOKEN_PENALTY = 0.3
+
+# Taken off a match for every character a misspelled word needed corrected
+TYPO_PENALTY = 0.05
+
+# Misspellings remembered per matcher; they come from user text, so the cache is bounded
+CORRECTION_CACHE_SIZE = 4096
+
+
+def normalize_name(text):
+    """Lowercase, strip accents and punctuation: "Nikola Jokić" -> "nikola jokic"."""
+    text = unicodedata.normalize("NFKD", str(text))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = re.sub(r"[^a-z0-9 ]+", " ", text.lower().replace("'", "").replace(".", ""))
+    return " ".join(text.split())
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_typos(length):
+    """Edits tolerated in a word of ``length`` characters; short words must be exact.
+
+    Four-letter words are too close to each other ("game" / "Gabe") to correct.
+    """
+    if length < 5:
+        return 0
+    return 1 if length < 8 else 2
+
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance (transpositions count once), capped at ``limit + 1``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+    return min(current[-1], limit + 1)
+
+
+def load_aliases(path=None):
+    """Default aliases plus any extra ``{"alias": "Full Name"}`` entries from a JSON file."""
+    aliases = dict(DEFAULT_ALIASES)
+    if path and os.path.exists(path):
+        try:
+            with open(path, "r") as f:
+                aliases.update(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not load player aliases: {e}")
+    return aliases
+
+
+class PlayerMatcher:
+    """Ranks player names against free text using a character-trigram index.
+
+    Exact names and aliases score 1.0, a unique last name, first name or set
+    of initials scores just below that, and everything else is ranked by
+    trigram overlap. Misspelled words are first corrected to the closest name
+    token and scored like the real thing, minus ``TYPO_PENALTY`` per edit.
+    Callers treat a score under their threshold as "ask GPT".
+    """
+
+    def __init__(self, player_names, aliases=None):
+        self.names = list(dict.fromkeys(player_names))
+        self.normalized = {}
+        self.exact = {}
+        self.by_token = {}
+        self.by_initials = {}
+        self.index = {}
+        self.grams = {}
+        self.token_grams = {}
+
+        for name in self.names:
+            norm = normalize_name(name)
+            self.normalized[name] = norm
+            self.exact[norm] = name
+            tokens = [t for t in norm.split() if t not in SUFFIXES]
+            for position, token in enumerate(tokens):
+                self.by_token.setdefault(token, {})[name] = "first" if position == 0 else "last"
+            self.by_initials.setdefault("".join(t[0] for t in tokens), []).append(name)
+            self.grams[name] = trigrams(norm)
+            self.token_grams[name] = [trigrams(token) for token in tokens]
+            for gram in self.grams[name]:
+                self.index.setdefault(gram, set()).add(name)
+
+        self.aliases = {}
+        for alias, target in (aliases or {}).items():
+            target_name = self.exact.get(normalize_name(target))
+            if target_name:
+                self.aliases[normalize_name(alias)] = target_name
+
+        # Words never corrected, and the name tokens corrections are drawn from, by length
+        self.known_words = set(self.by_token)
+        for phrase in list(self.exact) + [normalize_name(alias) for alias in aliases or {}]:
+            self.known_words.update(phrase.split())
+        self.tokens_by_length = {}
+        for token in self.by_token:
+            self.tokens_by_length.setdefault(len(token), []).append(token)
+        self._corrections = {}
+
+    def _correct(self, word):
+        """``(token, edits)`` for the one name token closest to a misspelled word, or None."""
+        if word in self._corrections:
+            return self._corrections[word]
+        limit = max_typos(len(word))
+        if not limit or word in self.known_words:
+            return None
+        closest, fewest = [], limit + 1
+        for length in range(len(word) - limit, len(word) + limit + 1):
+            for token in self.tokens_by_length.get(length, ()):
+                edits = edit_distance(word, token, limit)
+                if edits < fewest:
+                    closest, fewest = [token], edits
+                elif edits == fewest:
+                    closest.append(token)
+        # Equally close tokens ("gren" -> "green"/"grant") are left for GPT to sort out
+        correction = (closest[0], fewest) if len(closest) == 1 else None
+        if len(self._corrections) >= CORRECTION_CACHE_SIZE:
+            self._corrections.clear()
+        self._corrections[word] = correction
+        return correction
+
+    def _score_exact(self, text):
+        """Scores for whole-token matches (name, alias, last/first name, initials).
+
+        Returns ``(scores, shared)`` where ``shared`` holds the names matched
+        only through a token several players have; ``rank`` penalizes those.
+        """
+        if text in self.exact:
+            return {self.exact[text]: 1.0}, set()
+        if text in self.aliases:
+            return {self.aliases[text]: 1.0}, set()
+        scores = {}
+        matches = self.by_token.get(text, {})
+        for name, part in matches.items():
+            scores[name] = 0.95 if part == "last" else 0.9
+        shared = set(scores) if len(matches) > 1 else set()
+        initials = self.by_initials.get(text.replace(" ", ""), [])
+        if len(text) >= 2 and len(initials) == 1:
+            scores[initials[0]] = max(scores.get(initials[0], 0), 0.85)
+            shared.discard(initials[0])
+        return scores, shared
+
+    def _score_fuzzy(self, text):
+        """Dice coefficient of trigram sets for candidates sharing any trigram."""
+        query_grams = trigrams(text)
+        counts = {}
+        for gram in query_grams:
+            for name in self.index.get(gram, ()):
+                counts[name] = counts.get(name, 0) + 1
+        scores = {}
+        for name, shared in counts.items():
+            scores[name] = 2 * shared / (len(query_grams) + len(self.grams[name]))
+            # Also compare against individual name tokens so a partial name still ranks
+            for token_grams in self.token_grams[name]:
+                token_score = 2 * len(query_grams & token_grams) / (len(query_grams) + len(token_grams))
+                scores[name] = max(scores[name], token_score * 0.9)
+        return scores
+
+    def rank(self, text, limit=5):
+        """Return ``[(name, score), ...]`` best first for free text."""
+        norm = normalize_name(text)
+        if not norm:
+            return []
+        tokens = norm.split()
+        corrections = [self._correct(token) for token in tokens]
+        variants = [(tokens, [0] * len(tokens))]
+        if any(corrections):
+            # The same words with misspellings fixed ("anthony edwrds" -> "anthony edwards")
+            variants.append((
+                [fix[0] if fix else token for token, fix in zip(tokens, corrections)],
+                [fix[1] if fix else 0 for fix in corrections],
+            ))
+        scores = {}
+        shared, confirmed = set(), set()
+        # Try every span of up to three words so "curry assists" still finds Curry
+        for words, edits in variants:
+            for size in range(min(3, len(words)), 0, -1):
+                for start in range(len(words) - size + 1):
+                    span = " ".join(words[start:start + size])
+                    penalty = TYPO_PENALTY * sum(edits[start:start + size])
+                    span_scores, span_shared = self._score_exact(span)
+                    for name, score in span_scores.items():
+                        scores[name] = max(scores.get(name, 0), score - penalty)
+                    shared |= span_shared
+                    confirmed |= span_scores.keys() - span_shared
+        for name, score in self._score_fuzzy(norm).items():
+            scores[name] = max(scores.get(name, 0), score)
+        # Penalize after merging: the fuzzy pass scores the same shared token
+        # just as highly, so penalizing the exact score alone changes nothing
+        for name in shared - confirmed:
+            scores[name] -= SHARED_TOKEN_PENALTY
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+    def best(self, text):
+        """Return ``(name, score)`` for the best match, or ``(None, 0.0)``."""
+        ranked = self.rank(text, limit=2)
+        if not ranked:
+            return None, 0.0
+        name, score = ranked[0]
+        # Two equally good candidates means we don't actually know who was meant
+        if len(ranked) > 1 and ranked[1][1] == score and score < 1.0:
+            return None, score
+        return name, score
+
+    def suggest(self, text, n=3, cutoff=0.4):
+        """Names worth offering as "Did you mean" suggestions."""
+        return [name for name, score in self.rank(text, limit=n) if score >= cutoff]
@@ -0,0 +1,531 @@
+"""Image rendering helpers for the Discord bot.
+
+The ``render_*_png`` functions only take plain rows and return PNG bytes, so
+they can run in worker processes (see RenderService) without touching bot state.
+Each one can draw with matplotlib (the original look) or with the much faster
+Pillow table renderer, picked per call through ``renderer``.
+"""
+import asyncio
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from PIL import Image, ImageColor, ImageDraw, ImageFont
+
+RENDERERS = ("pillow", "matplotlib")
+
+# Shared dark Discord theme
+BACKGROUND_COLOR = '#2C2F33'
+ROW_COLORS = ('#40444B', '#36393F')  # odd, even data rows
+ROW_EDGE_COLOR = '#23272A'
+HEADER_EDGE_COLOR = 'white'
+
+# Pillow output is sized to match the matplotlib renders at dpi=200
+PIXELS_PER_POINT = 200 / 72
+
+# Rows drawn per Pillow table; the rest are summarized as "+N more" so the
+# image height (and the worker's memory) stays bounded on a full slate
+MAX_TABLE_ROWS = 50
+
+
+class RenderCache:
+    """LRU cache of rendered PNG bytes, bounded by entry count and total size.
+
+    Keys are content hashes of the rows being drawn plus the template name, so
+    the same table is only rendered once until the lines data changes.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(template, *parts):
+        """Hash a template name and the rows/labels it is rendered with."""
+        payload = json.dumps([template, *parts], default=str, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data):
+        # Images bigger than the whole budget would just flush everything else
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = data
+            self._size += len(data)
+            while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class RenderService:
+    """Runs render functions in a process pool behind an awaitable, bounded queue.
+
+    At most ``max_pending`` renders are queued or running at once; further
+    callers wait for a slot instead of piling work onto the pool, and the
+    event loop stays free while matplotlib runs.
+    """
+
+    def __init__(self, max_workers=None, max_pending=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.max_workers * 4
+        self._executor = None
+        self._slots = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            # Spawn rather than fork: the bot process has a running event loop and threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def render(self, func, *args):
+        """Run ``func(*args)`` in the pool and return its result."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        loop = asyncio.get_running_loop()
+        async with self._slots:
+            try:
+                return await loop.run_in_executor(self._get_executor(), func, *args)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM); start a fresh pool and retry once
+                self.shutdown(wait=False)
+                return await loop.run_in_executor(self._get_executor(), func, *args)
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
+
+
+def _pyplot():
+    """Import pyplot on first use so Pillow-only processes never load matplotlib."""
+    import matplotlib
+
+    # Headless backend: we only ever save figures, never show them
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+@lru_cache(maxsize=None)
+def _font(size, bold=False):
+    """Load DejaVu Sans (matplotlib's default face) at ``size`` points."""
+    name = "DejaVuSans-Bold.ttf" if bold else "DejaVuSans.ttf"
+    pixels = round(size * PIXELS_PER_POINT)
+    try:
+        return ImageFont.truetype(name, pixels)
+    except OSError:
+        pass
+    try:
+        # matplotlib bundles the font even when the system doesn't have it
+        import matplotlib
+
+        return ImageFont.truetype(os.path.join(matplotlib.get_data_path(), "fonts", "ttf", name), pixels)
+    except (ImportError, OSError):
+        return ImageFont.load_default(size=pixels)
+
+
+def _blend(color, background, alpha):
+    """Flatten a translucent color onto the background (for the footer text)."""
+    fg = ImageColor.getrgb(color)
+    bg = ImageColor.getrgb(background)
+    return tuple(round(f * alpha + b * (1 - alpha)) for f, b in zip(fg, bg))
+
+
+def _fit_text(draw, text, font, max_width):
+    """Trim text with an ellipsis so it stays inside its cell."""
+    if draw.textlength(text, font=font) <= max_width:
+        return text
+    while text and draw.textlength(text + "…", font=font) > max_width:
+        text = text[:-1]
+    return text + "…"
+
+
+def draw_table_png(title, column_titles, col_widths, table_data, header_color, header_text_color,
+                   footer_text, footer_color, width=1900, logo=False):
+    """Draw a themed table directly with Pillow and return PNG bytes.
+
+    Produces the same layout as the matplotlib renders (title, colored header,
+    alternating rows, footer watermark and optional logo) in a fraction of the time.
+    Only the first ``MAX_TABLE_ROWS`` rows are drawn.
+    """
+    hidden = max(len(table_data) - MAX_TABLE_ROWS, 0)
+    table_data = table_data[:MAX_TABLE_ROWS]
+
+    margin = 20
+    row_height = round(11 * PIXELS_PER_POINT * 1.6)
+    title_font = _font(16, bold=True)
+    header_font = _font(11, bold=True)
+    cell_font = _font(11)
+    footer_font = _font(10, bold=True)
+
+    table_width = width - 2 * margin
+    total_weight = sum(col_widths)
+    col_pixels = [round(table_width * w / total_weight) for w in col_widths]
+    col_pixels[-1] = table_width - sum(col_pixels[:-1])
+
+    title_height = round(16 * PIXELS_PER_POINT * 2.5)
+    footer_height = round(10 * PIXELS_PER_POINT * 3)
+    more_height = row_height if hidden else 0
+    table_height = row_height * (len(table_data) + 1)
+    height = margin + title_height + table_height + more_height + footer_height + margin
+
+    img = Image.new("RGB", (width, height), BACKGROUND_COLOR)
+    draw = ImageDraw.Draw(img)
+    draw.text((width // 2, margin + title_height // 2), title, font=title_font, fill='white', anchor="mm")
+
+    top = margin + title_height
+    rows = [(column_titles, header_color, header_text_color, header_font, HEADER_EDGE_COLOR)]
+    for row_number, row in enumerate(table_data, start=1):
+        rows.append((row, ROW_COLORS[row_number % 2 == 0], 'white', cell_font, ROW_EDGE_COLOR))
+
+    for row_number, (cells, fill, text_color, font, edge) in enumerate(rows):
+        y = top + row_number * row_height
+        x = margin
+        for cell, cell_width in zip(cells, col_pixels):
+            draw.rectangle([x, y, x + cell_width, y + row_height], fill=fill, outline=edge, width=1)
+            text = _fit_text(draw, str(cell), font, cell_width - 12)
+            draw.text((x + cell_width // 2, y + row_height // 2), text, font=font, fill=text_color, anchor="mm")
+            x += cell_width
+
+    if hidden:
+        draw.text((width // 2, top + table_height + more_height // 2), f"+{hidden} more",
+                  font=cell_font, fill='white', anchor="mm")
+
+    footer_y = top + table_height + more_height + footer_height // 2
+    draw.text((width // 2, footer_y), footer_text, font=footer_font,
+              fill=_blend(footer_color, BACKGROUND_COLOR, 0.7), anchor="mm")
+
+    if logo:
+        try:
+            img = _append_logo(img)
+        except Exception as e:
+            print(f"Warning: Could not process logo: {e}")
+
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def render_player_stats_png(player_name, table_data, renderer="matplotlib"):
+    """Render a player's lines (stat, line, opponent rows) as PNG bytes."""
+    if renderer == "pillow":
+        return draw_table_png(
+            f"{player_name}'s Prop Betting Lines", ["Stat Type", "Line", "Opponent"], [0.4, 0.2, 0.4],
+            table_data, '#552583', '#FDB927', f"StrikeBot • {player_name} Props", '#FDB927',
+        )
+
+    plt = _pyplot()
+    # Set the style for the plot
+    plt.style.use('ggplot')
+    
+    # Create figure with a dark background
+    fig, ax = plt.subplots(figsize=(10, min(0.5 * len(table_data) + 1, 20)))
+    fig.patch.set_facecolor('#2C2F33')  # Discord-like dark background
+    ax.set_facecolor('#2C2F33')
+    ax.axis('off')
+    
+    # Add a title with player name and NBA styling
+    ax.set_title(f"{player_name}'s Prop Betting Lines", fontsize=16, color='white', fontweight='bold', pad=20)
+    
+    # Table formatting
+    table = ax.table(
+        cellText=table_data,
+        colLabels=["Stat Type", "Line", "Opponent"],
+        loc='center',
+        cellLoc='center',
+        colWidths=[0.4, 0.2, 0.4]  # Adjust column widths for better proportions
+    )
+    
+    # Style the table
+    table.auto_set_font_size(False)
+    table.set_fontsize(11)
+    table.scale(1.2, 1.5)
+    
+    # Style header row with NBA team colors (using Lakers purple and gold)
+    header_color = '#552583'  # Lakers purple
+    header_text_color = '#FDB927'  # Lakers gold
+    
+    for col in range(3):
+        cell = table[0, col]
+        cell.set_facecolor(header_color)
+        cell.set_text_props(color=header_text_color, weight='bold')
+        cell.set_edgecolor('white')
+    
+    # Style data rows with alternating colors
+    for row in range(1, len(table_data) + 1):
+        row_color = '#36393F' if row % 2 == 0 else '#40444B'  # Discord-like alternating row colors
+        
+        for col in range(3):
+            cell = table[row, col]
+            cell.set_facecolor(row_color)
+            cell.set_text_props(color='white')
+            cell.set_edgecolor('#23272A')  # Darker border color
+    
+    # Add a subtle border around the entire table
+    for pos, cell in table._cells.items():
+        cell.set_linewidth(0.5)
+    
+    # Add a subtle player note at the bottom
+    fig.text(
+        0.5, 0.02, 
+        f"StrikeBot • {player_name} Props", 
+        ha='center', 
+        color='#FDB927', 
+        alpha=0.7,
+        fontsize=10,
+        fontweight='bold'
+    )
+    
+    # Save with high quality
+    buffer = io.BytesIO()
+    plt.savefig(buffer, format='png', bbox_inches='tight', dpi=200, facecolor=fig.get_facecolor())
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def render_lines_table_png(table_data, renderer="matplotlib"):
+    """Render lines (player, stat, line, opponent rows) as PNG bytes."""
+    column_titles = ["Player", "Stat Type", "Line", "Opponent"]
+    if renderer == "pillow":
+        return draw_table_png(
+            'NBA Prop Betting Lines', column_titles, [0.3, 0.25, 0.15, 0.3], table_data,
+            '#552583', '#FDB927', "StrikeBot NBA Props", '#FDB927', width=2270,
+        )
+
+    plt = _pyplot()
+
+    # Set the style for the plot
+    plt.style.use('ggplot')
+    
+    # Create figure with a dark background
+    fig, ax = plt.subplots(figsize=(12, min(0.6 * len(table_data) + 1.5, 25)))
+    fig.patch.set_facecolor('#2C2F33')  # Discord-like dark background
+    ax.set_facecolor('#2C2F33')
+    ax.axis('off')
+    
+    # Add a title with NBA-themed styling
+    ax.set_title('NBA Prop Betting Lines', fontsize=16, color='white', fontweight='bold', pad=20)
+    
+    # Create the table with custom styling
+    table = ax.table(
+        cellText=table_data, 
+        colLabels=column_titles, 
+        loc='center', 
+        cellLoc='center',
+        colWidths=[0.3, 0.25, 0.15, 0.3]  # Adjust column widths for better proportions
+    )
+    
+    # Style the table
+    table.auto_set_font_size(False)
+    table.set_fontsize(11)
+    table.scale(1.2, 1.5)
+    
+    # Style header row (team colors - using Lakers purple and gold as inspiration)
+    header_color = '#552583'  # Lakers purple
+    header_text_color = '#FDB927'  # Lakers gold
+    
+    for col in range(len(column_titles)):
+        cell = table[0, col]
+        cell.set_facecolor(header_color)
+        cell.set_text_props(color=header_text_color, weight='bold')
+        cell.set_edgecolor('white')
+    
+    # Style data rows with alternating colors for better readability
+    for row in range(1, len(table_data) + 1):
+        row_color = '#36393F' if row % 2 == 0 else '#40444B'  # Discord-like alternating row colors
+        
+        for col in range(len(column_titles)):
+            cell = table[row, col]
+            cell.set_facecolor(row_color)
+            cell.set_text_props(color='white')
+            cell.set_edgecolor('#23272A')  # Darker border color
+    
+    # Add a subtle border around the entire table
+    for pos, cell in table._cells.items():
+        cell.set_linewidth(0.5)
+    
+    # Add a subtle NBA-themed watermark/logo hint at the bottom
+    fig.text(
+        0.5, 0.02, 
+        "StrikeBot NBA Props", 
+        ha='center', 
+        color='#FDB927', 
+        alpha=0.7,
+        fontsize=10,
+        fontweight='bold'
+    )
+    
+    # Save with high quality
+    buffer = io.BytesIO()
+    plt.savefig(buffer, format='png', bbox_inches='tight', dpi=200, facecolor=fig.get_facecolor())
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+LOGO_PATH = os.path.join(os.path.dirname(__file__), "bet_confirmation.png")  # your uploaded logo
+
+
+@lru_cache(maxsize=1)
+def load_logo():
+    """Load the confirmation logo once per process instead of on every render."""
+    with Image.open(LOGO_PATH) as logo:
+        return logo.convert("RGBA")
+
+
+def _append_logo(table_img):
+    """Paste the logo centred under a rendered table, on the dark background."""
+    logo_img = load_logo()
+
+    # Resize logo to 15% of table width
+    new_logo_width = int(table_img.width * 0.15)
+    aspect_ratio = logo_img.height / logo_img.width
+    new_logo_size = (new_logo_width, int(new_logo_width * aspect_ratio))
+    logo_img = logo_img.resize(new_logo_size, Image.LANCZOS)
+
+    # Create new image with space for both - using dark background
+    spacing = 20
+    total_height = table_img.height + logo_img.height + spacing
+    new_img = Image.new("RGBA", (table_img.width, total_height), (44, 47, 51, 255))  # Discord dark color
+    new_img.paste(table_img, (0, 0))
+    new_img.paste(logo_img, ((table_img.width - logo_img.width) // 2, table_img.height + spacing), logo_img)
+    return new_img.convert("RGB")
+
+
+def render_bet_confirmation_png(table_data, entry_fee, renderer="matplotlib"):
+    """Render bet slip rows (player, stat, line, bet type) with the logo as PNG bytes."""
+    # Set title with entry fee information if provided
+    title = "Bet Confirmation"
+    if entry_fee is not None:
+        title = f"Bet Confirmation - ${entry_fee}"
+
+    if renderer == "pillow":
+        return draw_table_png(
+            title, ["Player", "Stat Type", "Line", "Bet Type"], [0.3, 0.3, 0.15, 0.25], table_data,
+            '#1E8449', '#FFFFFF', "StrikeBot • Bet Confirmation", '#7CFC00', logo=True,
+        )
+
+    plt = _pyplot()
+    # Set the style for the plot
+    plt.style.use('ggplot')
+
+    # Step 1: Generate main table image with modern styling
+    column_titles = ["Player", "Stat Type", "Line", "Bet Type"]
+
+    # Create figure with a dark background
+    fig, ax = plt.subplots(figsize=(10, min(0.6 * len(table_data) + 1.5, 20)))
+    fig.patch.set_facecolor('#2C2F33')  # Discord-like dark background
+    ax.set_facecolor('#2C2F33')
+    ax.axis('off')
+
+    # Create the table with custom styling
+    table = ax.table(
+        cellText=table_data,
+        colLabels=column_titles,
+        loc='center',
+        cellLoc='center',
+        colWidths=[0.3, 0.3, 0.15, 0.25]  # Adjust column widths for better proportions
+    )
+
+    # Style the table
+    table.auto_set_font_size(False)
+    table.set_fontsize(11)
+    table.scale(1.2, 1.5)
+
+    # Style header row with a green theme for confirmation
+    header_color = '#1E8449'  # Dark green
+    header_text_color = '#FFFFFF'  # White text
+    
+    for col in range(len(column_titles)):
+        cell = table[0, col]
+        cell.set_facecolor(header_color)
+        cell.set_text_props(color=header_text_color, weight='bold')
+        cell.set_edgecolor('white')
+
+    # Style data rows with alternating colors
+    for row in range(1, len(table_data) + 1):
+        row_color = '#36393F' if row % 2 == 0 else '#40444B'  # Discord-like alternating row colors
+        
+        for col in range(len(column_titles)):
+            cell = table[row, col]
+            cell.set_facecolor(row_color)
+            cell.set_text_props(color='white')
+            cell.set_edgecolor('#23272A')  # Darker border color
+
+    # Add a subtle border around the entire table
+    for pos, cell in table._cells.items():
+        cell.set_linewidth(0.5)
+
+    ax.set_title(title, fontsize=16, color='white', fontweight='bold', pad=20)
+
+    # Add a subtle confirmation note at the bottom
+    fig.text(
+        0.5, 0.02, 
+        "StrikeBot • Bet Confirmation", 
+        ha='center', 
+        color='#7CFC00', 
+        alpha=0.7,
+        fontsize=10,
+        fontweight='bold'
+    )
+
+    # Render the table into memory with high quality
+    table_buffer = io.BytesIO()
+    plt.savefig(table_buffer, format='png', bbox_inches='tight', dpi=200, facecolor=fig.get_facecolor())
+    plt.close(fig)
+
+    # Step 2: Load both table image and logo
+    table_buffer.seek(0)
+    table_img = Image.open(table_buffer)
+    
+    try:
+        final_img = _append_logo(table_img)
+    except Exception as e:
+        # If logo processing fails, just use the table image
+        print(f"Warning: Could not process logo: {e}")
+        final_img = table_img.convert("RGB")
+
+    buffer = io.BytesIO()
+    final_img.save(buffer, format="PNG")
+    return buffer.getvalue()
@@ -0,0 +1,423 @@
+"""Per-user bot state kept in memory and persisted to SQLite.
+
+Handlers keep using plain dict/set operations on ``SessionDict`` and
+``SessionSet``; values are written back in batches (write-behind) by
+``SessionStore.flush``, and other bot processes sharing the database file
+pick the changes up with ``SessionStore.sync``. Entries idle for longer
+than a namespace's ``ttl``, or beyond its ``max_entries``, are evicted so
+memory stays bounded however many users pass through; the idle clock is
+shared through the database, so an entry only expires once no process has
+used it for ``ttl`` seconds.
+"""
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping, MutableSet
+
+_MISSING = object()
+
+
+def _dumps(value):
+    # default=str keeps odd values (e.g. datetimes) from breaking a whole flush
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+class SessionDict(MutableMapping):
+    """Dict-like namespace of the session store.
+
+    Values may be mutated in place (``state["step"] = ...``), so every key
+    read since the last flush is re-serialized then, and only written if
+    it actually changed. ``default_factory`` works like ``defaultdict``'s.
+    Any read, write or ``in`` check counts as activity for ``ttl`` (seconds
+    idle before ``sweep`` drops the entry); ``max_entries`` evicts the least
+    recently used entry on insert.
+    """
+
+    def __init__(self, store, namespace, default_factory=None, ttl=None, max_entries=None):
+        self.store = store
+        self.namespace = namespace
+        self.default_factory = default_factory
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.expired = 0
+        self.evicted = 0
+        self._data = {}
+        self._written = {}
+        self._touched = set()
+        # key -> last activity, least recently used first
+        self._access = OrderedDict()
+        # Keys used since the last flush, and the last activity the database knows of
+        self._used = set()
+        self._shared_use = {}
+        # key -> sweep cutoff, for entries expired here but not yet in the database
+        self._expiring = {}
+
+    def _refresh(self, key):
+        self._access[key] = time.time()
+        self._access.move_to_end(key)
+        self._used.add(key)
+
+    def _use(self, key):
+        # The value may be mutated in place, so re-check it on the next flush
+        self._touched.add(key)
+        self._refresh(key)
+
+    def _insert(self, key, value):
+        self._data[key] = value
+        self._use(key)
+        if self.max_entries is not None:
+            while len(self._data) > self.max_entries:
+                self._drop(next(iter(self._access)))
+                self.evicted += 1
+
+    def _forget(self, key):
+        self._data.pop(key, None)
+        self._access.pop(key, None)
+        self._shared_use.pop(key, None)
+        self._used.discard(key)
+
+    def _drop(self, key):
+        self._forget(key)
+        # Deleted from the database on the next flush
+        self._touched.add(key)
+
+    def __getitem__(self, key):
+        try:
+            value = self._data[key]
+        except KeyError:
+            if self.default_factory is None:
+                raise
+            value = self.default_factory()
+            self._insert(key, value)
+            return value
+        self._use(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key in self._data:
+            self._data[key] = value
+            self._use(key)
+        else:
+            self._insert(key, value)
+
+    def __delitem__(self, key):
+        if key not in self._data:
+            raise KeyError(key)
+        self._drop(key)
+
+    def __contains__(self, key):
+        if key not in self._data:
+            return False
+        # A membership check is activity too (``user_id in verified_users``)
+        self._refresh(key)
+        return True
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        if key in self._data:
+            self._use(key)
+            return self._data[key]
+        return default
+
+    def sweep(self, now=None):
+        """Drop entries idle for longer than ``ttl``; returns how many were dropped."""
+        if self.ttl is None:
+            return 0
+        cutoff = (now or time.time()) - self.ttl
+        dropped = 0
+        while self._access:
+            key, last_used = next(iter(self._access.items()))
+            if last_used > cutoff:
+                break
+            # Another process may have used it since our last sync, so the
+            # database row is only deleted if it is idle there too
+            self._forget(key)
+            self._touched.discard(key)
+            self._written.pop(key, None)
+            self._expiring[key] = cutoff
+            dropped += 1
+        self.expired += dropped
+        return dropped
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.namespace!r}, {self._data!r})"
+
+    def _pending(self, touch_interval):
+        """Collect what the database is missing since the last flush.
+
+        Returns ``(changes, touches, expirations)``: ``[(key, json or None,
+        last_used)]`` for out-of-date values, ``[(key, last_used)]`` for
+        activity the database is more than ``touch_interval`` seconds behind
+        on, and ``[(key, cutoff)]`` for entries expired by ``sweep``.
+        """
+        changes = []
+        for key in self._touched:
+            value = self._data.get(key, _MISSING)
+            encoded = None if value is _MISSING else _dumps(value)
+            if self._written.get(key) != encoded:
+                if encoded is None:
+                    # Nothing left to compare against once the deletion is written
+                    self._written.pop(key, None)
+                else:
+                    self._written[key] = encoded
+                    self._shared_use[key] = self._access[key]
+                changes.append((key, encoded, self._access.get(key)))
+        self._touched.clear()
+
+        touches = []
+        if self.ttl is not None:
+            for key in self._used:
+                last_used = self._access.get(key)
+                if last_used is None or key not in self._written:
+                    continue
+                if last_used - self._shared_use.get(key, 0.0) >= touch_interval:
+                    self._shared_use[key] = last_used
+                    touches.append((key, last_used))
+        self._used.clear()
+
+        expirations = list(self._expiring.items())
+        self._expiring.clear()
+        return changes, touches, expirations
+
+    def _load(self, key, encoded, used_at=None):
+        """Apply a value (and last activity) written by this or another process."""
+        if key in self._touched:
+            # A local change that hasn't been flushed yet (local wins)
+            return
+        if encoded is None:
+            self._written.pop(key, None)
+            self._forget(key)
+            return
+        if self._written.get(key) != encoded or key not in self._data:
+            self._written[key] = encoded
+            self._data[key] = json.loads(encoded)
+        # Activity in any process counts towards the idle clock
+        used_at = used_at or time.time()
+        self._shared_use[key] = max(self._shared_use.get(key, 0.0), used_at)
+        self._access[key] = max(self._access.get(key, 0.0), used_at)
+        self._access.move_to_end(key)
+
+
+class SessionSet(MutableSet):
+    """Set-like namespace of the session store (members are stored as keys)."""
+
+    def __init__(self, store, namespace, ttl=None, max_entries=None):
+        self._members = SessionDict(store, namespace, ttl=ttl, max_entries=max_entries)
+        self.namespace = namespace
+
+    @property
+    def expired(self):
+        return self._members.expired
+
+    @property
+    def evicted(self):
+        return self._members.evicted
+
+    def __contains__(self, member):
+        return member in self._members
+
+    def __iter__(self):
+        return iter(self._members)
+
+    def __len__(self):
+        return len(self._members)
+
+    def add(self, member):
+        if member not in self._members:
+            self._members[member] = True
+
+    def discard(self, member):
+        if member in self._members:
+            del self._members[member]
+
+    def sweep(self, now=None):
+        return self._members.sweep(now)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.namespace!r}, {set(self._members)!r})"
+
+    def _pending(self, touch_interval):
+        return self._members._pending(touch_interval)
+
+    def _load(self, key, encoded, used_at=None):
+        self._members._load(key, encoded, used_at)
+
+
+class SessionStore:
+    """SQLite-backed home for ``SessionDict``/``SessionSet`` namespaces.
+
+    Reads and writes hit the in-memory namespaces; ``flush`` batches all
+    pending changes into one transaction and ``run`` does that (plus
+    ``sync``) every ``interval`` seconds off the event loop. WAL mode lets
+    several bot processes share one database file; the last write wins.
+    Each row also records when any process last used it (written at most
+    every ``touch_interval`` seconds per key), which is what ``ttl`` expiry
+    is checked against.
+    """
+
+    def __init__(self, path, interval=2.0, sweep_interval=60.0, touch_interval=60.0):
+        self.path = path
+        self.interval = interval
+        self.sweep_interval = sweep_interval
+        self.touch_interval = touch_interval
+        self.namespaces = {}
+        self.writes = 0
+        self._last_sync = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT,"
+            " updated_at REAL NOT NULL,"
+            " used_at REAL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(sessions)")}
+        if "used_at" not in columns:
+            # Databases from before the idle clock was shared; updated_at stands in
+            self._conn.execute("ALTER TABLE sessions ADD COLUMN used_at REAL")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at)")
+        self._task = None
+
+    def dict(self, namespace, default_factory=None, ttl=None, max_entries=None):
+        return self._register(SessionDict(self, namespace, default_factory, ttl=ttl, max_entries=max_entries))
+
+    def set(self, namespace, ttl=None, max_entries=None):
+        return self._register(SessionSet(self, namespace, ttl=ttl, max_entries=max_entries))
+
+    def _register(self, container):
+        self.namespaces[container.namespace] = container
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value, COALESCE(used_at, updated_at) FROM sessions WHERE namespace = ?",
+                (container.namespace,),
+            ).fetchall()
+        for key, encoded, used_at in rows:
+            container._load(key, encoded, used_at)
+        return container
+
+    def sweep(self, now=None):
+        """Expire idle entries in every namespace; returns how many were dropped."""
+        return sum(container.sweep(now) for container in self.namespaces.values())
+
+    def stats(self):
+        """Live/expired/evicted counts per namespace."""
+        return {
+            namespace: {"live": len(container), "expired": container.expired, "evicted": container.evicted}
+            for namespace, container in self.namespaces.items()
+        }
+
+    def pending(self):
+        """Collect unsaved changes; call on the thread that owns the containers."""
+        changes, touches, expirations = [], [], []
+        for namespace, container in self.namespaces.items():
+            own_changes, own_touches, own_expirations = container._pending(self.touch_interval)
+            changes += [(namespace, *change) for change in own_changes]
+            touches += [(namespace, *touch) for touch in own_touches]
+            expirations += [(namespace, *expiration) for expiration in own_expirations]
+        return changes, touches, expirations
+
+    def write(self, pending):
+        """Write collected changes in one transaction (safe to run in a worker thread)."""
+        changes, touches, expirations = pending
+        if not (changes or touches or expirations):
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                # Only rows idle in every process are deleted; the rest are
+                # bumped so the process that expired them syncs them back
+                self._conn.executemany(
+                    "UPDATE sessions SET value = CASE WHEN COALESCE(used_at, updated_at) <= ?"
+                    " THEN NULL ELSE value END, updated_at = ?"
+                    " WHERE namespace = ? AND key = ? AND value IS NOT NULL",
+                    [(cutoff, now, namespace, key) for namespace, key, cutoff in expirations],
+                )
+                self._conn.executemany(
+                    "INSERT INTO sessions (namespace, key, value, updated_at, used_at) VALUES (?, ?, ?, ?, ?)"
+                    " ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value,"
+                    " updated_at = excluded.updated_at,"
+                    " used_at = MAX(COALESCE(used_at, 0), COALESCE(excluded.used_at, 0))",
+                    [(namespace, key, encoded, now, used_at) for namespace, key, encoded, used_at in changes],
+                )
+                self._conn.executemany(
+                    "UPDATE sessions SET used_at = MAX(COALESCE(used_at, 0), ?), updated_at = ?"
+                    " WHERE namespace = ? AND key = ? AND value IS NOT NULL",
+                    [(used_at, now, namespace, key) for namespace, key, used_at in touches],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        self.writes += len(changes)
+
+    def flush(self):
+        """Synchronously save every pending change (used at shutdown)."""
+        self.write(self.pending())
+
+    def purge_deleted(self, age=3600.0):
+        """Remove deletion markers once every process has had time to see them."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM sessions WHERE value IS NULL AND updated_at < ?", (time.time() - age,)
+            )
+
+    def fetch_updates(self):
+        """Rows changed (by any process) since the last sync."""
+        with self._lock:
+            since = self._last_sync
+            self._last_sync = time.time()
+            # Small overlap so a write committed during the previous sync isn't missed
+            return self._conn.execute(
+                "SELECT namespace, key, value, COALESCE(used_at, updated_at) FROM sessions"
+                " WHERE updated_at >= ?",
+                (since - 1.0,),
+            ).fetchall()
+
+    def sync(self, rows):
+        """Apply rows from ``fetch_updates``; call on the thread that owns the containers."""
+        for namespace, key, encoded, used_at in rows:
+            container = self.namespaces.get(namespace)
+            if container is not None:
+                container._load(key, encoded, used_at)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        self._last_sync = time.time()
+        last_sweep = time.time()
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                if time.time() - last_sweep >= self.sweep_interval:
+                    self.sweep()
+                    last_sweep = time.time()
+                    await loop.run_in_executor(None, self.purge_deleted)
+                await loop.run_in_executor(None, self.write, self.pending())
+                self.sync(await loop.run_in_executor(None, self.fetch_updates))
+            except Exception as e:
+                print(f"Warning: Could not save user sessions: {e}")
+
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+        self.flush()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,153 @@
+"""NBA team names, abbreviations and rosters."""
+import json
+import os
+import re
+import threading
+import time
+
+from matching import normalize_name
+
+EASTERN_TEAMS = {
+    "atlanta": "ATL", "hawks": "ATL", "atl": "ATL",
+    "boston": "BOS", "celtics": "BOS", "bos": "BOS",
+    "brooklyn": "BKN", "nets": "BKN", "bkn": "BKN",
+    "charlotte": "CHA", "hornets": "CHA", "cha": "CHA",
+    "chicago": "CHI", "bulls": "CHI", "chi": "CHI",
+    "cleveland": "CLE", "cavaliers": "CLE", "cavs": "CLE", "cle": "CLE",
+    "detroit": "DET", "pistons": "DET", "det": "DET",
+    "indiana": "IND", "pacers": "IND", "ind": "IND",
+    "miami": "MIA", "heat": "MIA", "mia": "MIA",
+    "milwaukee": "MIL", "bucks": "MIL", "mil": "MIL",
+    "new york": "NYK", "knicks": "NYK", "nyk": "NYK",
+    "orlando": "ORL", "magic": "ORL", "orl": "ORL",
+    "philadelphia": "PHI", "76ers": "PHI", "sixers": "PHI", "phi": "PHI",
+    "toronto": "TOR", "raptors": "TOR", "tor": "TOR",
+    "washington": "WAS", "wizards": "WAS", "was": "WAS",
+}
+
+WESTERN_TEAMS = {
+    "dallas": "DAL", "mavericks": "DAL", "mavs": "DAL", "dal": "DAL",
+    "denver": "DEN", "nuggets": "DEN", "den": "DEN",
+    "golden state": "GSW", "warriors": "GSW", "gsw": "GSW", "gs": "GSW",
+    "houston": "HOU", "rockets": "HOU", "hou": "HOU",
+    "los angeles clippers": "LAC", "clippers": "LAC", "lac": "LAC",
+    "los angeles lakers": "LAL", "lakers": "LAL", "lal": "LAL",
+    "memphis": "MEM", "grizzlies": "MEM", "mem": "MEM",
+    "minnesota": "MIN", "timberwolves": "MIN", "wolves": "MIN", "min": "MIN",
+    "new orleans": "NOP", "pelicans": "NOP", "pels": "NOP", "nop": "NOP",
+    "oklahoma city": "OKC", "thunder": "OKC", "okc": "OKC",
+    "phoenix": "PHX", "suns": "PHX", "phx": "PHX",
+    "portland": "POR", "trail blazers": "POR", "blazers": "POR", "por": "POR",
+    "sacramento": "SAC", "kings": "SAC", "sac": "SAC",
+    "san antonio": "SAS", "spurs": "SAS", "sas": "SAS",
+    "utah": "UTA", "jazz": "UTA", "uta": "UTA",
+}
+
+TEAM_ALIASES = {**EASTERN_TEAMS, **WESTERN_TEAMS}
+
+TEAM_CODES = sorted(set(TEAM_ALIASES.values()))
+
+# Abbreviations that are also ordinary words; only trusted in upper case
+AMBIGUOUS_ALIASES = {"was", "min"}
+
+# Longest aliases first so "los angeles lakers" wins over "lakers"
+_ALIAS_PATTERN = re.compile(
+    r"\b(" + "|".join(re.escape(alias) for alias in sorted(TEAM_ALIASES, key=len, reverse=True)) + r")\b",
+    re.IGNORECASE,
+)
+
+
+def find_teams(text):
+    """Return ``[(team_code, start, end), ...]`` for team names mentioned in ``text``."""
+    found = []
+    for match in _ALIAS_PATTERN.finditer(str(text)):
+        alias = match.group(1)
+        if alias.lower() in AMBIGUOUS_ALIASES and not alias.isupper():
+            continue
+        found.append((TEAM_ALIASES[alias.lower()], match.start(), match.end()))
+    return found
+
+
+class RosterStore:
+    """Team code -> player names, kept in a JSON file and refreshed on demand.
+
+    Rosters are league-wide; ``on_slate`` narrows one to the players that
+    currently have lines and caches the result per team until the slate's
+    player list changes.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.rosters = {}
+        self.updated_at = {}
+        self._slate_version = None
+        self._slate_names = {}
+        self._slate_rosters = {}
+        self._lock = threading.Lock()
+        if path:
+            self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not load team rosters: {e}")
+            return
+        with self._lock:
+            for team_code, entry in data.items():
+                self.rosters[team_code] = list(entry.get("players", []))
+                self.updated_at[team_code] = entry.get("updated_at")
+            self._slate_rosters.clear()
+
+    def save(self):
+        """Write every roster to ``path`` atomically."""
+        if not self.path:
+            return
+        with self._lock:
+            data = {
+                team_code: {"players": players, "updated_at": self.updated_at.get(team_code)}
+                for team_code, players in sorted(self.rosters.items())
+            }
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Warning: Could not save team rosters: {e}")
+
+    def get(self, team_code):
+        return self.rosters.get(team_code)
+
+    def set(self, team_code, players):
+        with self._lock:
+            self.rosters[team_code] = list(dict.fromkeys(players))
+            self.updated_at[team_code] = time.time()
+            self._slate_rosters.pop(team_code, None)
+
+    def missing(self, team_codes=TEAM_CODES):
+        return [team_code for team_code in team_codes if team_code not in self.rosters]
+
+    def on_slate(self, team_code, line_index):
+        """Players on ``team_code``'s roster that have lines, in roster order, or None if unknown."""
+        with self._lock:
+            if self._slate_version != line_index.players_version:
+                self._slate_version = line_index.players_version
+                self._slate_names = {normalize_name(name): name for name in line_index.players()}
+                self._slate_rosters.clear()
+            cached = self._slate_rosters.get(team_code)
+            if cached is not None:
+                return cached
+            roster = self.rosters.get(team_code)
+            if roster is None:
+                return None
+            on_slate = [
+                self._slate_names[normalize_name(name)]
+                for name in roster
+                if normalize_name(name) in self._slate_names
+            ]
+            self._slate_rosters[team_code] = on_slate
+            return on_slate
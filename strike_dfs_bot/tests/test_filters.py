@@ -0,0 +1,32 @@
+from filters import parse_filter_query
+from matching import PlayerMatcher
+
+PLAYERS = ["Stephen Curry", "Anthony Edwards", "Jalen Green", "Draymond Green"]
+STATS = {"points", "rebounds", "assists"}
+
+
+def parse(text):
+    return parse_filter_query(text, PlayerMatcher(PLAYERS), STATS)
+
+
+def test_upper_case_ambiguous_codes_are_opponents():
+    spec = parse("curry points vs MIN")
+    assert spec["players"] == ["Stephen Curry"]
+    assert spec["opponents"] == ["MIN"]
+    assert spec["stats"] == ["points"]
+
+    spec = parse("edwards rebounds against WAS")
+    assert spec["players"] == ["Anthony Edwards"]
+    assert spec["opponents"] == ["WAS"]
+
+
+def test_lower_case_ambiguous_words_are_not_teams():
+    spec = parse("curry points vs timberwolves")
+    assert spec["opponents"] == ["MIN"]
+    assert parse("what was curry points")["opponents"] == []
+
+
+def test_line_range():
+    spec = parse("curry points OVER 25")
+    assert spec["min_line"] == 25.0
+    assert spec["players"] == ["Stephen Curry"]
@@ -0,0 +1,25 @@
+import pytest
+
+from intent import BET, SEARCH, classify_intent
+from matching import PlayerMatcher
+
+PLAYERS = ["Stephen Curry", "LeBron James", "Anthony Edwards"]
+STATS = ["points", "rebounds", "assists"]
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return PlayerMatcher(PLAYERS)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("curry points over 25", None),
+    ("celtics points over 25", None),
+    ("show curry points over 25", SEARCH),
+    ("lakers rebounds", SEARCH),
+    ("curry points vs MIN", SEARCH),
+    ("$10 on lebron over 25.5 points", BET),
+    ("parlay curry over 4.5 assists", BET),
+])
+def test_classify_intent(matcher, text, expected):
+    assert classify_intent(text, matcher, STATS) == expected
@@ -0,0 +1,41 @@
+import pytest
+
+from matching import PlayerMatcher
+
+THRESHOLD = 0.8  # PLAYER_MATCH_THRESHOLD's default in bot.py
+
+PLAYERS = [
+    "Stephen Curry", "Kristaps Porzingis", "Anthony Edwards", "Anthony Black", "Cole Anthony",
+    "Luka Dončić", "Draymond Green", "Jalen Green", "Gabe Vincent",
+]
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return PlayerMatcher(PLAYERS)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("curyy", "Stephen Curry"),
+    ("porzingas", "Kristaps Porzingis"),
+    ("edwrds", "Anthony Edwards"),
+    ("donic", "Luka Dončić"),
+    ("stephn curry", "Stephen Curry"),
+    ("anthony edwrds", "Anthony Edwards"),
+])
+def test_single_typos_resolve_locally(matcher, text, expected):
+    name, score = matcher.best(text)
+    assert name == expected
+    assert score >= THRESHOLD
+
+
+def test_full_name_typo_outranks_shared_first_name(matcher):
+    ranked = matcher.rank("anthony edwrds")
+    assert ranked[0][0] == "Anthony Edwards"
+    assert dict(ranked)["Cole Anthony"] < THRESHOLD
+
+
+@pytest.mark.parametrize("text", ["green", "gren", "anthony", "game"])
+def test_ambiguous_or_unknown_words_are_left_to_gpt(matcher, text):
+    name, score = matcher.best(text)
+    assert name is None or score < THRESHOLD
@@ -0,0 +1,220 @@
+"""Login-token storage for the auth backend (app.py)."""
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+
+class TokenStore:
+    """Tokens in an embedded SQLite database.
+
+    Insert, lookup and delete are single indexed statements, and the file
+    can be shared by several worker processes (WAL mode) and threads (one
+    connection per thread).
+    """
+
+    def __init__(self, path, legacy_json=None):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS tokens ("
+            " token TEXT PRIMARY KEY,"
+            " user_id TEXT NOT NULL,"
+            " expires_at TEXT NOT NULL,"
+            " expires_ts REAL NOT NULL)"
+        )
+        # Ordered expiry index: the sweeper deletes from its low end
+        conn.execute("CREATE INDEX IF NOT EXISTS tokens_expires_ts ON tokens (expires_ts)")
+        # Nonces of signed tokens that have been used, kept until the token would expire anyway
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS used_tokens (nonce TEXT PRIMARY KEY, expires_ts REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS used_tokens_expires_ts ON used_tokens (expires_ts)")
+        conn.execute("CREATE TABLE IF NOT EXISTS token_stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self._sweeper = None
+        if legacy_json:
+            self.import_json(legacy_json)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _timestamp(expires_at):
+        # expires_at is a naive UTC ISO string, as handed out by /generate_token
+        return datetime.fromisoformat(expires_at).replace(tzinfo=timezone.utc).timestamp()
+
+    def add(self, token, user_id, expires_at):
+        """Insert a token; returns False if it already exists."""
+        try:
+            self._conn().execute(
+                "INSERT INTO tokens (token, user_id, expires_at, expires_ts) VALUES (?, ?, ?, ?)",
+                # JSON-encoded so ints stay ints in the verify response
+                (token, json.dumps(user_id), expires_at, self._timestamp(expires_at)),
+            )
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def get(self, token):
+        """Return ``{"user_id", "expires_at"}`` for a token, or None."""
+        row = self._conn().execute(
+            "SELECT user_id, expires_at FROM tokens WHERE token = ?", (token,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"user_id": json.loads(row[0]), "expires_at": row[1]}
+
+    def delete(self, token):
+        """Remove a token; returns True if it existed (so only one caller can consume it)."""
+        cursor = self._conn().execute("DELETE FROM tokens WHERE token = ?", (token,))
+        return cursor.rowcount > 0
+
+    def consume(self, nonce, expires_at):
+        """Mark a signed token's nonce as used; returns False if it already was."""
+        try:
+            self._conn().execute(
+                "INSERT INTO used_tokens (nonce, expires_ts) VALUES (?, ?)",
+                (nonce, self._timestamp(expires_at)),
+            )
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM tokens").fetchone()[0]
+
+    def purge_expired(self, now=None):
+        """Delete every expired token in one statement; returns how many were removed."""
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            now = now or time.time()
+            removed = conn.execute("DELETE FROM tokens WHERE expires_ts <= ?", (now,)).rowcount
+            # An expired signed token is rejected before its nonce is looked at
+            conn.execute("DELETE FROM used_tokens WHERE expires_ts <= ?", (now,))
+            if removed:
+                conn.execute(
+                    "INSERT INTO token_stats (name, value) VALUES ('expired', ?)"
+                    " ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+                    (removed,),
+                )
+        return removed
+
+    def stats(self, now=None):
+        """Live tokens, expired tokens not yet swept, and tokens swept so far (all workers)."""
+        conn = self._conn()
+        now = now or time.time()
+        live = conn.execute("SELECT COUNT(*) FROM tokens WHERE expires_ts > ?", (now,)).fetchone()[0]
+        pending = conn.execute("SELECT COUNT(*) FROM tokens WHERE expires_ts <= ?", (now,)).fetchone()[0]
+        used = conn.execute("SELECT COUNT(*) FROM used_tokens").fetchone()[0]
+        row = conn.execute("SELECT value FROM token_stats WHERE name = 'expired'").fetchone()
+        return {
+            "live": live,
+            "expired_pending": pending,
+            "expired_total": row[0] if row else 0,
+            "signed_used": used,
+        }
+
+    def start_sweeper(self, interval=60.0):
+        """Purge expired tokens every ``interval`` seconds on a daemon thread."""
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return self._sweeper
+        stop = threading.Event()
+
+        def sweep():
+            while not stop.wait(interval):
+                try:
+                    self.purge_expired()
+                except sqlite3.Error as e:
+                    print(f"Warning: Could not purge expired tokens: {e}")
+
+        self._sweeper = threading.Thread(target=sweep, name="token-sweeper", daemon=True)
+        self._sweeper.stop = stop
+        self._sweeper.start()
+        return self._sweeper
+
+    def stop_sweeper(self):
+        if self._sweeper is not None:
+            self._sweeper.stop.set()
+
+    def import_json(self, path):
+        """One-off import of the old ``token_store.json`` file, which is then renamed.
+
+        Every server worker runs this at startup, so another worker may rename
+        the file first; inserts are idempotent, so losing that race is harmless.
+        """
+        if not os.path.exists(path):
+            return 0
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not import {path}: {e}")
+            return 0
+        imported = sum(
+            self.add(token, record["user_id"], record["expires_at"])
+            for token, record in data.items()
+        )
+        try:
+            os.replace(path, f"{path}.imported")
+        except FileNotFoundError:
+            pass
+        return imported
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+class TokenSigner:
+    """Self-contained tokens: ``payload.signature``, both base64url.
+
+    The payload carries the user id, expiry and a random nonce, so checking
+    a token needs no lookup at all; only a token that passes is recorded
+    (``TokenStore.consume``) to make it single-use.
+    """
+
+    def __init__(self, secret):
+        self.key = secret.encode() if isinstance(secret, str) else secret
+
+    def _sign(self, payload):
+        # 128 bits of HMAC-SHA256 keeps the token short
+        return hmac.new(self.key, payload, hashlib.sha256).digest()[:16]
+
+    def issue(self, user_id, expires_at):
+        payload = _b64encode(json.dumps(
+            {"u": user_id, "e": expires_at, "n": _b64encode(secrets.token_bytes(12))},
+            separators=(",", ":"),
+        ).encode())
+        return f"{payload}.{_b64encode(self._sign(payload.encode('ascii')))}"
+
+    def verify(self, token):
+        """Return ``{"user_id", "expires_at", "nonce"}`` if the signature checks out, else None."""
+        try:
+            payload, signature = token.split(".")
+            if not hmac.compare_digest(self._sign(payload.encode("ascii")), _b64decode(signature)):
+                return None
+            data = json.loads(_b64decode(payload))
+            return {"user_id": data["u"], "expires_at": data["e"], "nonce": data["n"]}
+        except (AttributeError, ValueError, KeyError, TypeError, binascii.Error):
+            return None